@@ -1,16 +1,102 @@
+import os
+import json
+import hashlib
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from bs4 import BeautifulSoup
 import pandas as pd
-import re
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, ".http_cache")
+
+# Parser lxml jauh lebih cepat; fallback ke html.parser bila tidak terpasang
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# Session dengan connection pool dan retry untuk error sementara (429/5xx)
+def make_session(pool_size=8, retries=3, backoff=0.5):
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=('GET',),
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = 'FutureMinded-scraper/1.0'
+    return session
+
+# Cache HTTP di disk: body halaman + validator ETag/Last-Modified per URL
+class HttpCache:
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json"), os.path.join(self.cache_dir, f"{key}.body")
+
+    def get(self, url):
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url, response):
+        meta_path, body_path = self._paths(url)
+        meta = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+        # Body ditulis dulu, lalu meta; keduanya via os.replace agar tidak ada entri setengah jadi
+        for path, data, mode in ((body_path, response.content, 'wb'), (meta_path, json.dumps(meta), 'w')):
+            with open(f"{path}.tmp", mode) as f:
+                f.write(data)
+            os.replace(f"{path}.tmp", path)
+
+# Ambil halaman dengan conditional request; 304 berarti halaman tidak berubah dan body cache dipakai
+def fetch(session, url, cache=None, timeout=15):
+    headers = {}
+    cached = cache.get(url) if cache is not None else None
+    if cached is not None:
+        meta, _ = cached
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+    response = session.get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304:
+        if cached is not None:
+            return cached[1], True
+        # 304 tanpa entri cache (cache terhapus/proxy perantara): anggap miss dan ambil ulang tanpa validator
+        response = session.get(url, headers={'Cache-Control': 'no-cache'}, timeout=timeout)
+        if response.status_code == 304:
+            raise requests.HTTPError(f"304 tanpa body untuk {url} padahal tidak ada cache", response=response)
+    response.raise_for_status()
+    if cache is not None:
+        cache.put(url, response)
+    return response.content, False
 
 # Fungsi untuk mengambil data dari halaman O*NET
-def scrape_onet_personality(url, personality):
-    response = requests.get(url)
-    soup = BeautifulSoup(response.content, 'html.parser')
-    
+def parse_onet_personality(html):
+    soup = BeautifulSoup(html, HTML_PARSER)
+
     # Inisialisasi list untuk menyimpan data
     data = []
-    
+
     # Temukan tabel di halaman
     table = soup.find('table')
     if table:
@@ -21,16 +107,16 @@ def scrape_onet_personality(url, personality):
                 job_code = cols[0].text.strip()
                 job_title = cols[1].text.strip()
                 job_zone = cols[2].text.strip()
-                
+
                 # Ambil interest areas
                 interest_areas = cols[3].text.strip().split(', ')
                 first_interest = interest_areas[0] if len(interest_areas) > 0 else None
                 second_interest = interest_areas[1] if len(interest_areas) > 1 else None
                 third_interest = interest_areas[2] if len(interest_areas) > 2 else None
-                
+
                 # Cek apakah ditampilkan di "Fewer Occupations"
                 shown_fewer = 'Yes' if 'Show fewer occupations' in cols[3].text else None
-                
+
                 data.append({
                     'O*NET-SOC Code': job_code,
                     'O*NET-SOC Title': job_title,
@@ -40,14 +126,13 @@ def scrape_onet_personality(url, personality):
                     'Third Interest Area': third_interest,
                     'Shown in Fewer Occupations': shown_fewer
                 })
-    
+
     return pd.DataFrame(data)
 
 # Fungsi untuk mengambil dataset pekerjaan
-def scrape_onet_occupations(url):
-    response = requests.get(url)
-    soup = BeautifulSoup(response.content, 'html.parser')
-    
+def parse_onet_occupations(html):
+    soup = BeautifulSoup(html, HTML_PARSER)
+
     data = []
     table = soup.find('table')
     if table:
@@ -58,15 +143,40 @@ def scrape_onet_occupations(url):
                 code = cols[0].text.strip()
                 occupation = cols[1].text.strip()
                 job_family = cols[2].text.strip()
-                
+
                 data.append({
                     'Code': code,
                     'Occupation': occupation,
                     'Job Family': job_family
                 })
-    
+
     return pd.DataFrame(data)
 
+def scrape_onet_personality(url, personality, session=None, cache=None):
+    return parse_onet_personality(fetch(session or make_session(), url, cache)[0])
+
+def scrape_onet_occupations(url, session=None, cache=None):
+    return parse_onet_occupations(fetch(session or make_session(), url, cache)[0])
+
+# Scraping semua halaman secara paralel lewat satu session
+def scrape_all(riasec_urls, occupation_url, cache_dir=CACHE_DIR, max_workers=8, timeout=15, session=None):
+    session = session or make_session(pool_size=max_workers)
+    cache = HttpCache(cache_dir) if cache_dir else None
+    urls = list(riasec_urls.values()) + [occupation_url]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = dict(zip(urls, pool.map(lambda url: fetch(session, url, cache, timeout), urls)))
+
+    riasec_dfs = [parse_onet_personality(results[url][0]) for url in riasec_urls.values()]
+    riasec_combined = pd.concat(riasec_dfs, ignore_index=True)
+    # Pekerjaan yang muncul di beberapa halaman interest cukup disimpan sekali
+    if not riasec_combined.empty:
+        riasec_combined = riasec_combined.drop_duplicates(subset='O*NET-SOC Code', keep='first').reset_index(drop=True)
+
+    occupation_df = parse_onet_occupations(results[occupation_url][0])
+    not_modified = sum(1 for _, from_cache in results.values() if from_cache)
+    return riasec_combined, occupation_df, not_modified
+
 # Link dari dokumen
 riasec_urls = {
     'Realistic': 'https://www.onetonline.org/explore/interests/Realistic/',
@@ -78,20 +188,12 @@ riasec_urls = {
 }
 occupation_url = 'https://www.onetonline.org/find/family?f=0&g=Go'
 
-# Scraping dataset RIASEC
-riasec_dfs = []
-for personality, url in riasec_urls.items():
-    df = scrape_onet_personality(url, personality)
-    riasec_dfs.append(df)
-
-# Gabungkan semua dataset RIASEC
-riasec_combined = pd.concat(riasec_dfs, ignore_index=True)
-
-# Scraping dataset pekerjaan
-occupation_df = scrape_onet_occupations(occupation_url)
+if __name__ == "__main__":
+    riasec_combined, occupation_df, not_modified = scrape_all(riasec_urls, occupation_url)
 
-# Simpan ke CSV
-riasec_combined.to_csv('riasec_dataset.csv', index=False)
-occupation_df.to_csv('occupation_dataset.csv', index=False)
+    # Simpan ke CSV
+    riasec_combined.to_csv('riasec_dataset.csv', index=False)
+    occupation_df.to_csv('occupation_dataset.csv', index=False)
 
-print("Dataset berhasil disimpan: riasec_dataset.csv dan occupation_dataset.csv")
\ No newline at end of file
+    print(f"{not_modified} halaman tidak berubah sejak scraping terakhir (dipakai dari cache)")
+    print("Dataset berhasil disimpan: riasec_dataset.csv dan occupation_dataset.csv")
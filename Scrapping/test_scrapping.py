@@ -0,0 +1,123 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from Scrapping_Data import HttpCache, fetch, make_session, scrape_all
+
+# Halaman tiruan O*NET: dua halaman interest dengan satu kode yang sama, plus halaman job family
+def interest_page(rows):
+    body = ''.join(f"<tr><td>{code}</td><td>{title}</td><td>2</td><td>{areas}</td></tr>" for code, title, areas in rows)
+    return f"<table><tr><th>Code</th><th>Title</th><th>Zone</th><th>Interest</th></tr>{body}</table>".encode()
+
+PAGES = {
+    '/Realistic/': interest_page([('47-2031.00', 'Carpenters', 'Realistic, Conventional'),
+                                  ('17-2141.00', 'Mechanical Engineers', 'Realistic, Investigative')]),
+    '/Investigative/': interest_page([('17-2141.00', 'Mechanical Engineers', 'Investigative, Realistic'),
+                                      ('19-2012.00', 'Physicists', 'Investigative, Artistic')]),
+    '/family': b"<table><tr><th>Code</th><th>Occupation</th><th>Family</th></tr>"
+               b"<tr><td>47-2031.00</td><td>Carpenters</td><td>Construction and Extraction</td></tr></table>",
+}
+
+
+class OnetHandler(BaseHTTPRequestHandler):
+    hits = Counter()
+
+    def log_message(self, *args):
+        pass
+
+    def send_body(self, body, etag=None):
+        self.send_response(200)
+        if etag:
+            self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.hits[self.path] += 1
+        if self.path == '/flaky' and self.hits[self.path] <= 2:
+            # Dua kali 503 dulu, percobaan ketiga berhasil
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        elif self.path == '/stale304' and self.headers.get('Cache-Control') != 'no-cache':
+            # Proxy perantara yang menjawab 304 walau klien tidak mengirim validator
+            self.send_response(304)
+            self.end_headers()
+        elif self.path in PAGES or self.path in ('/flaky', '/stale304'):
+            body = PAGES.get(self.path, b'ok')
+            etag = '"v1"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+            else:
+                self.send_body(body, etag)
+        else:
+            self.send_error(404)
+
+
+class ScrappingTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), OnetHandler)
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        OnetHandler.hits.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = HttpCache(self.tmp.name)
+        self.session = make_session(retries=3, backoff=0)
+
+    def tearDown(self):
+        self.session.close()
+        self.tmp.cleanup()
+
+    def test_etag_304_reuses_cached_body(self):
+        url = f"{self.base}/Realistic/"
+        body, from_cache = fetch(self.session, url, self.cache)
+        self.assertFalse(from_cache)
+        again, from_cache = fetch(self.session, url, self.cache)
+        self.assertTrue(from_cache)
+        self.assertEqual(again, body)
+        self.assertEqual(OnetHandler.hits['/Realistic/'], 2)
+
+    def test_retry_on_5xx(self):
+        body, _ = fetch(self.session, f"{self.base}/flaky", self.cache)
+        self.assertEqual(body, b'ok')
+        self.assertEqual(OnetHandler.hits['/flaky'], 3)
+
+    def test_304_without_cache_entry_refetches(self):
+        body, from_cache = fetch(self.session, f"{self.base}/stale304", self.cache)
+        self.assertFalse(from_cache)
+        self.assertEqual(body, b'ok')
+        self.assertEqual(self.cache.get(f"{self.base}/stale304")[1], b'ok')
+
+    def test_scrape_all_dedups_by_code(self):
+        urls = {'Realistic': f"{self.base}/Realistic/", 'Investigative': f"{self.base}/Investigative/"}
+        riasec, occupations, not_modified = scrape_all(urls, f"{self.base}/family", cache_dir=self.tmp.name,
+                                                       max_workers=2, session=self.session)
+        self.assertEqual(list(riasec['O*NET-SOC Code']), ['47-2031.00', '17-2141.00', '19-2012.00'])
+        # Duplikat disimpan sesuai kemunculan pertama (halaman Realistic)
+        self.assertEqual(riasec.loc[1, 'First Interest Area'], 'Realistic')
+        self.assertEqual(len(occupations), 1)
+        self.assertEqual(not_modified, 0)
+
+        _, _, not_modified = scrape_all(urls, f"{self.base}/family", cache_dir=self.tmp.name,
+                                        max_workers=2, session=self.session)
+        self.assertEqual(not_modified, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
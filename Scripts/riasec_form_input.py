@@ -1,3 +1,8 @@
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../web"))
+from questionnaire import compile_weights, score_answers
+
 # ========================
 # RIASEC FORM 42 PERNYATAAN (Bahasa Indonesia dari PDF)
 # ========================
@@ -57,7 +62,11 @@ riasec_index = {
     'Conventional':  [5, 11, 17, 23, 29, 35, 41]
 }
 
-riasec_scores = {k: 0 for k in riasec_types}
+# Pemetaan butir -> dimensi dikompilasi sekali menjadi matriks bobot 42x6
+item_types = [dim for i in range(len(questions)) for dim, idxs in riasec_index.items() if i in idxs]
+weights, offset = compile_weights(item_types, dimensions=riasec_types)
+
+answers = []
 
 print("\nSilakan isi kuesioner berikut dari 1 (sangat tidak setuju) sampai 5 (sangat setuju):\n")
 
@@ -66,16 +75,14 @@ for i, q in enumerate(questions):
         try:
             ans = int(input(f"{i+1}. {q} [1-5]: "))
             if 1 <= ans <= 5:
-                for dim, idxs in riasec_index.items():
-                    if i in idxs:
-                        riasec_scores[dim] += ans
+                answers.append(ans)
                 break
             else:
                 print("Masukkan harus antara 1 dan 5.")
         except:
             print("Input tidak valid. Masukkan angka 1 sampai 5.")
 
-normalized_scores = [round(riasec_scores[k]/7, 2) for k in riasec_types]
+normalized_scores = score_answers(answers, weights, offset).tolist()
 print("\nSkor RIASEC Anda (rata-rata):")
 for k, v in zip(riasec_types, normalized_scores):
     print(f"{k}: {v}")
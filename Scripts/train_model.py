@@ -1,3 +1,6 @@
+import os
+import sys
+import argparse
 import tensorflow as tf
 import numpy as np
 import pandas as pd
@@ -6,6 +9,19 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import joblib
 
+# train/ didahulukan agar "train_model" merujuk ke train/train_model.py, bukan skrip ini
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../train"))
+from train_model import build_neighbor_lists, checkpoint_key, training_callbacks
+
+parser = argparse.ArgumentParser(description="Training model embedding RIASEC (triplet offline)")
+parser.add_argument("--epochs", type=int, default=20, help="Jumlah epoch maksimum")
+parser.add_argument("--patience", type=int, default=5, help="Epoch tanpa perbaikan val_loss sebelum berhenti")
+# Direktori sendiri agar tidak berbagi best.weights.h5 dengan train/train_model.py (model berbeda)
+parser.add_argument("--checkpoint-dir", default="Model/checkpoints/triplet")
+parser.add_argument("--resume", action="store_true",
+                    help="Lanjutkan run yang terputus dengan data dan konfigurasi yang sama")
+args = parser.parse_args()
+
 # ========================
 # 1. Load dan Preprocessing Data
 # ========================
@@ -51,26 +67,39 @@ embedding_model = create_embedding_model()
 # ========================
 # 3. Triplet Sampling
 # ========================
-def generate_triplets(data, n_triplets=10000):
-    triplets = []
-    for _ in range(n_triplets):
-        anchor_idx = np.random.randint(len(data))
-        anchor = data[anchor_idx]
-        dists = np.linalg.norm(data - anchor, axis=1)
-        positive_pool = np.where(dists < 1.0)[0]
-        negative_pool = np.where(dists > 2.0)[0]
-        if len(positive_pool) > 1 and len(negative_pool) > 0:
-            positive_idx = np.random.choice(positive_pool)
-            while positive_idx == anchor_idx:
-                positive_idx = np.random.choice(positive_pool)
-            negative_idx = np.random.choice(negative_pool)
-            triplets.append((anchor, data[positive_idx], data[negative_idx]))
-    return triplets
-
-triplets = generate_triplets(riasec_scaled)
-anchors = np.array([t[0] for t in triplets])
-positives = np.array([t[1] for t in triplets])
-negatives = np.array([t[2] for t in triplets])
+def sample_negatives(data, anchor_idx, neg_threshold, rng, max_rounds=20):
+    # Rejection sampling tervektorisasi: hanya kandidat yang gagal yang diundi ulang
+    negative_idx = rng.integers(len(data), size=len(anchor_idx))
+    pending = np.arange(len(anchor_idx))
+    for _ in range(max_rounds):
+        dists = np.linalg.norm(data[negative_idx[pending]] - data[anchor_idx[pending]], axis=1)
+        pending = pending[dists <= neg_threshold]
+        if len(pending) == 0:
+            return negative_idx
+        negative_idx[pending] = rng.integers(len(data), size=len(pending))
+    # Anchor dengan sedikit kandidat negatif: pilih langsung dari pool per anchor
+    for a in np.unique(anchor_idx[pending]):
+        rows = pending[anchor_idx[pending] == a]
+        pool = np.flatnonzero(np.linalg.norm(data - data[a], axis=1) > neg_threshold)
+        negative_idx[rows] = rng.choice(pool, size=len(rows))
+    return negative_idx
+
+def generate_triplets(data, n_triplets=10000, pos_threshold=1.0, neg_threshold=2.0, seed=None):
+    rng = np.random.default_rng(seed)
+    indptr, indices, neg_counts = build_neighbor_lists(data, pos_threshold, neg_threshold)
+    pos_counts = np.diff(indptr)
+    eligible = np.flatnonzero((pos_counts > 0) & (neg_counts > 0))
+    if len(eligible) == 0:
+        empty = np.empty((0, data.shape[1]), dtype=data.dtype)
+        return empty, empty, empty
+
+    anchor_idx = rng.choice(eligible, size=n_triplets)
+    offsets = (rng.random(n_triplets) * pos_counts[anchor_idx]).astype(np.int64)
+    positive_idx = indices[indptr[anchor_idx] + offsets]
+    negative_idx = sample_negatives(data, anchor_idx, neg_threshold, rng)
+    return data[anchor_idx], data[positive_idx], data[negative_idx]
+
+anchors, positives, negatives = generate_triplets(riasec_scaled, seed=42)
 
 # ========================
 # 4. Triplet Loss
@@ -97,19 +126,32 @@ merged_output = tf.keras.layers.Concatenate()([embedded_anchor, embedded_positiv
 triplet_model = tf.keras.Model(inputs=[input_anchor, input_positive, input_negative], outputs=merged_output)
 triplet_model.compile(optimizer='adam', loss=triplet_loss())
 
+# Checkpoint dan early stopping sama dengan train/train_model.py: state per epoch untuk
+# melanjutkan run yang terputus (--resume, hanya bila data dan konfigurasi sama), bobot
+# terbaik run tersebut di best.weights.h5
+run_key = checkpoint_key(riasec_scaled, model='triplet-offline', n_triplets=len(anchors), triplet_seed=42,
+                         batch_size=64, validation_split=0.2)
+callbacks, best_path = training_callbacks(args.checkpoint_dir, args.patience, args.resume, run_key)
+
 history = triplet_model.fit(
     [anchors, positives, negatives],
-    np.zeros(len(triplets)),
-    epochs=20,
+    np.zeros(len(anchors)),
+    epochs=args.epochs,
     batch_size=64,
     validation_split=0.2,
+    callbacks=callbacks,
     verbose=1
 )
 
+# Bobot terbaik (termasuk dari run sebelum resume) dipakai untuk model yang disimpan
+if best_path is not None and os.path.exists(best_path):
+    triplet_model.load_weights(best_path)
+
 # ========================
 # 6. Simpan Model Embedding
 # ========================
-embedding_model.save("Model/embedding_model.keras")
+# Format yang sama dengan train/train_model.py dan yang dimuat aplikasi web
+embedding_model.save("Model/embedding_model.h5")
 
 # ========================
 # 7. Plot Loss
@@ -0,0 +1,235 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tracemalloc
+import warnings
+import numpy as np
+
+# Benchmark jalur panas aplikasi: load model/scaler, rekomendasi (tunggal & batch),
+# chart RIASEC, PDF, dan cold import web/app.py. Hasil (p50/p95/p99 + memori puncak)
+# dibandingkan dengan baseline JSON; exit code 1 bila ada metrik yang memburuk
+# melebihi threshold dan melebihi derau yang terukur pada run itu sendiri.
+# Baseline disimpan per environment (mesin, jumlah CPU, versi Python/NumPy): angka dari
+# mesin lain tidak dipakai sebagai acuan, rekam dulu dengan --save-baseline di mesin ini.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+WEB_DIR = os.path.join(BASE_DIR, "../web")
+BASELINE_PATH = os.path.join(BASE_DIR, "baseline.json")
+sys.path.append(WEB_DIR)
+
+COMPARED_METRICS = ('p50_ms', 'p95_ms', 'peak_kb')
+# Selisih p50 baru dihitung regresi bila melebihi NOISE_IQR x IQR sampel
+NOISE_IQR = 3.0
+# p95 dari sampel sedikit praktis = sampel terlambat; di bawah ini hanya p50 yang dibandingkan
+MIN_TAIL_SAMPLES = 20
+# Cold import diukur per proses baru dan sangat dipengaruhi page cache/beban mesin: hanya p50
+GATED_METRICS = {'cold_import_app': ('p50_ms',)}
+
+
+def summarize(samples_ms):
+    samples = np.asarray(samples_ms)
+    return {
+        'n': len(samples),
+        'mean_ms': round(float(samples.mean()), 3),
+        'p50_ms': round(float(np.percentile(samples, 50)), 3),
+        'iqr_ms': round(float(np.percentile(samples, 75) - np.percentile(samples, 25)), 3),
+        'p95_ms': round(float(np.percentile(samples, 95)), 3),
+        'p99_ms': round(float(np.percentile(samples, 99)), 3),
+    }
+
+
+def measure(fn, repeats, warmup=1, setup=None):
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+    samples = []
+    for _ in range(repeats):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    result = summarize(samples)
+
+    # Memori puncak diukur pada putaran terpisah karena tracemalloc memperlambat eksekusi
+    if setup:
+        setup()
+    tracemalloc.start()
+    fn()
+    result['peak_kb'] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    tracemalloc.stop()
+    return result
+
+
+def cold_import(module, repeats):
+    # Setiap sampel adalah interpreter baru sehingga tidak ada cache modul
+    code = (
+        "import time, resource; start = time.perf_counter(); "
+        f"import {module}; "
+        "print((time.perf_counter() - start) * 1000, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+    )
+    samples, peaks = [], []
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, "-W", "ignore", "-c", code], cwd=WEB_DIR,
+                             capture_output=True, text=True, check=True)
+        elapsed, maxrss = out.stdout.strip().splitlines()[-1].split()
+        samples.append(float(elapsed))
+        peaks.append(int(maxrss))
+    result = summarize(samples)
+    # ru_maxrss (KB) proses anak; bukan tracemalloc, tapi cukup untuk mendeteksi regresi
+    result['peak_kb'] = float(max(peaks))
+    return result
+
+
+def run_suite(repeats=50, import_repeats=5, only=None):
+    import resources
+    import app
+    from batch_recommend import recommend_batch
+
+    rng = np.random.default_rng(0)
+    user_scores = rng.uniform(1, 5, size=6).round(2).tolist()
+    batch_answers = rng.integers(1, 6, size=(100, 42))
+    scores = dict(zip(app.riasec_types.keys(), user_scores))
+    dominant = max(scores, key=scores.get)
+    chart_png = app.create_riasec_chart(scores, dark_mode=True, dpi=app.PDF_CHART_DPI)
+    resources.get_job_index()
+
+    benchmarks = {
+        # Load hanya beberapa milidetik; sampel penuh agar p95 tidak ditentukan satu outlier
+        'load_model': lambda: measure(resources.get_model, repeats,
+                                      setup=lambda: resources.invalidate('model')),
+        'load_scaler': lambda: measure(resources.get_scaler, repeats,
+                                       setup=lambda: resources.invalidate('scaler')),
+        'recommend_single': lambda: measure(lambda: app.recommend_jobs(user_scores, 5), repeats),
+        'recommend_batch_100': lambda: measure(
+            lambda: recommend_batch(batch_answers, resources.get_model(), resources.get_scaler(),
+                                    resources.get_job_index(), 5), repeats),
+        # Render tanpa lru_cache agar yang diukur adalah biaya matplotlib sebenarnya
+        'create_riasec_chart': lambda: measure(
+            lambda: app._render_riasec_chart.__wrapped__(tuple(user_scores), True, 100), repeats // 5 or 1),
+        'create_pdf': lambda: measure(
+            lambda: app.create_pdf("Benchmark", scores, dominant, ["A", "B", "C", "D", "E"], chart_png),
+            repeats // 5 or 1),
+        'cold_import_app': lambda: cold_import('app', import_repeats),
+    }
+    results = {}
+    for name, bench in benchmarks.items():
+        if only and name not in only:
+            continue
+        # Index dibangun ulang bila model/scaler di-invalidate; siapkan di luar pengukuran
+        resources.get_job_index()
+        results[name] = bench()
+        print(f"{name:<22} p50={results[name]['p50_ms']:>9.3f} ms  p95={results[name]['p95_ms']:>9.3f} ms  "
+              f"p99={results[name]['p99_ms']:>9.3f} ms  peak={results[name]['peak_kb']:>10.1f} KB")
+    return results
+
+
+def noise_floor(metric, base, result, min_delta_ms=1.0, min_delta_kb=256.0):
+    # Ambang derau absolut per metrik: untuk p50 NOISE_IQR x IQR, untuk p95 lebar ekor
+    # (p99 - p50); diambil yang terbesar dari baseline dan run ini, minimal min_delta_ms
+    if metric == 'peak_kb':
+        return min_delta_kb
+    if metric == 'p95_ms':
+        spreads = [r['p99_ms'] - r['p50_ms'] for r in (base, result) if 'p99_ms' in r and 'p50_ms' in r]
+    else:
+        spreads = [NOISE_IQR * r['iqr_ms'] for r in (base, result) if 'iqr_ms' in r]
+    return max([min_delta_ms] + spreads)
+
+
+def compare(results, baseline, threshold, min_delta_ms=1.0, min_delta_kb=256.0):
+    # Regresi = lebih lambat/boros dari baseline * (1 + threshold) DAN selisih absolut di atas
+    # ambang derau, agar metrik yang hanya beberapa milidetik tidak gagal karena jitter
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            continue
+        for metric in GATED_METRICS.get(name, COMPARED_METRICS):
+            if metric not in base:
+                continue
+            if metric == 'p95_ms' and min(base.get('n', 0), result['n']) < MIN_TAIL_SAMPLES:
+                continue
+            old, new = base[metric], result[metric]
+            floor = noise_floor(metric, base, result, min_delta_ms, min_delta_kb)
+            if new > old * (1 + threshold) and new - old > floor:
+                regressions.append(f"{name}.{metric}: {old} -> {new} (+{(new / old - 1) * 100 if old else float('inf'):.0f}%, "
+                                   f"ambang derau {floor:.3f})")
+    return regressions
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+    }
+
+
+def environment_key(env):
+    # Kunci baseline: hal yang menggeser angka secara sistematis (bukan versi kernel/hostname)
+    python = '.'.join(env['python'].split('.')[:2])
+    return f"{env.get('machine', '')}-{env['cpu_count']}cpu-py{python}-numpy{env['numpy']}"
+
+
+def load_baselines(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get('baselines', {})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark jalur panas aplikasi dengan baseline regresi")
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--import-repeats", type=int, default=20, help="Jumlah interpreter baru untuk cold import")
+    parser.add_argument("--only", nargs="*", help="Jalankan benchmark tertentu saja")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=0.25, help="Toleransi regresi relatif (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="Tulis hasil sebagai baseline baru")
+    parser.add_argument("--out", default=None, help="Simpan hasil run ini ke file JSON")
+    parser.add_argument("--model", default=None, help="Override path model .h5")
+    parser.add_argument("--scaler", default=None, help="Override path scaler.pkl")
+    parser.add_argument("--catalog", default=None, help="Override path job_with_family.csv")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    import resources
+    resources.MODEL_PATH = args.model or resources.MODEL_PATH
+    resources.SCALER_PATH = args.scaler or resources.SCALER_PATH
+    resources.CATALOG_PATH = args.catalog or resources.CATALOG_PATH
+
+    report = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': environment(),
+        'results': run_suite(args.repeats, args.import_repeats, args.only),
+    }
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    baselines = load_baselines(args.baseline)
+    key = environment_key(report['environment'])
+    if args.save_baseline:
+        baselines[key] = report
+        with open(f"{args.baseline}.tmp", 'w') as f:
+            json.dump({'baselines': baselines}, f, indent=2)
+        os.replace(f"{args.baseline}.tmp", args.baseline)
+        print(f"Baseline untuk {key} disimpan ke {args.baseline}")
+    elif key in baselines:
+        regressions = compare(report['results'], baselines[key], args.threshold)
+        if regressions:
+            print(f"\nRegresi melebihi {args.threshold:.0%} dibanding baseline {key}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nTidak ada regresi melebihi {args.threshold:.0%} dibanding baseline {key}")
+    else:
+        print(f"\nBaseline untuk environment {key} belum ada di {args.baseline}; "
+              f"jalankan dengan --save-baseline di mesin ini sebelum memakai exit code")
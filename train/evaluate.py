@@ -0,0 +1,192 @@
+import os
+import sys
+import json
+import time
+import argparse
+import warnings
+import numpy as np
+import pandas as pd
+
+# ========================
+# Evaluasi offline kualitas retrieval dan latensi
+# ========================
+# Membandingkan rekomendasi berbasis embedding (jalur yang sama dengan recommend_jobs:
+# scaler -> model -> index pekerjaan) dengan baseline cosine pada enam skor RIASEC
+# terstandardisasi. Setiap pekerjaan di katalog dipakai sebagai query (dirinya sendiri
+# dikecualikan). Relevansi diturunkan dari kode Holland O*NET (kolom First/Second/Third
+# Interest High-Point, kode 1-6 = R, I, A, S, E, C; 0 = tidak ada):
+#   3 = dua high-point pertama sama dan berurutan
+#   2 = high-point pertama sama
+#   1 = high-point pertama kandidat termasuk tiga high-point query
+# Relevan untuk recall@k bila relevansi >= 2 (minat utama sama).
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, "../web"))
+import resources
+
+# Default = artefak yang dilayani aplikasi: resources mengikuti pointer release
+# (Model/current.json) bila ada, sehingga yang dievaluasi adalah model yang sedang aktif
+MODEL_PATH = resources.MODEL_PATH
+SCALER_PATH = resources.SCALER_PATH
+CATALOG_PATH = resources.CATALOG_PATH
+JOB_INDEX_DIR = resources.JOB_INDEX_DIR
+riasec_types = ['Realistic', 'Investigative', 'Artistic', 'Social', 'Enterprising', 'Conventional']
+HIGH_POINT_COLUMNS = ['First Interest High-Point', 'Second Interest High-Point', 'Third Interest High-Point']
+RELEVANT_GRADE = 2
+
+
+# ========================
+# Metode retrieval
+# ========================
+class EmbeddingRetriever:
+    name = 'embedding'
+
+    def __init__(self, model, scaler, index):
+        from job_index import l2_normalize
+        self.model = model
+        self.scaler = scaler
+        self.index = index
+        self._normalize = l2_normalize
+
+    def scores(self, raw_scores):
+        scaled = (np.asarray(raw_scores, dtype=np.float32) - self.scaler.mean_) / self.scaler.scale_
+        user_embed = self._normalize(self.model.predict(scaled.astype(np.float32), verbose=0))
+        return self.index.score_matrix(user_embed)
+
+
+class RawFeatureRetriever:
+    # Baseline: cosine langsung pada skor RIASEC terstandardisasi, tanpa model
+    name = 'raw_cosine'
+
+    def __init__(self, scaler, catalog_scores):
+        from job_index import l2_normalize
+        self.scaler = scaler
+        self._normalize = l2_normalize
+        self.catalog = l2_normalize(self._scale(catalog_scores))
+
+    def _scale(self, raw_scores):
+        return ((np.asarray(raw_scores, dtype=np.float32) - self.scaler.mean_) / self.scaler.scale_).astype(np.float32)
+
+    def scores(self, raw_scores):
+        return self._normalize(self._scale(raw_scores)) @ self.catalog.T
+
+
+# ========================
+# Metrik
+# ========================
+def relevance_matrix(high_points):
+    # high_points: (n, 3) kode Holland per pekerjaan -> (n, n) relevansi bertingkat 0-3
+    hp = np.asarray(high_points, dtype=np.int64)
+    first, second = hp[:, 0], hp[:, 1]
+    same_first = (first[:, None] == first[None, :]) & (first[:, None] > 0)
+    same_second = (second[:, None] == second[None, :]) & (second[:, None] > 0)
+    in_query_code = ((hp[:, None, :] == first[None, :, None]) & (hp[:, None, :] > 0)).any(axis=2)
+    rel = np.where(same_first & same_second, 3, np.where(same_first, 2, np.where(in_query_code, 1, 0)))
+    np.fill_diagonal(rel, 0)
+    return rel.astype(np.int8)
+
+
+def ranked(scores, k):
+    from topk import top_k_rows
+    scores = np.array(scores, dtype=np.float32)
+    # Pekerjaan query sendiri tidak boleh muncul di hasilnya
+    np.fill_diagonal(scores, -np.inf)
+    return top_k_rows(scores, k)[0]
+
+
+def ndcg_at_k(rel, top_idx, k):
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+    gains = (2.0 ** np.take_along_axis(rel, top_idx, axis=1) - 1) @ discounts[:top_idx.shape[1]]
+    best_rel = -np.sort(-rel, axis=1)[:, :k]
+    ideal = (2.0 ** best_rel - 1) @ discounts[:k]
+    valid = ideal > 0
+    return float(np.mean(gains[valid] / ideal[valid]))
+
+
+def recall_at_k(rel, top_idx, k):
+    # Recall dinormalisasi dengan min(k, jumlah relevan) agar bisa mencapai 1
+    relevant = rel >= RELEVANT_GRADE
+    hits = np.take_along_axis(relevant, top_idx, axis=1).sum(axis=1)
+    total = np.minimum(relevant.sum(axis=1), k)
+    valid = total > 0
+    return float(np.mean(hits[valid] / total[valid]))
+
+
+def family_hit_rate(families, top_idx):
+    return float(np.mean(families[top_idx] == families[:, None]))
+
+
+def quality(retriever, queries, rel, families, ks):
+    top_idx = ranked(retriever.scores(queries), max(ks))
+    report = {}
+    for k in ks:
+        report[f'recall@{k}'] = round(recall_at_k(rel, top_idx[:, :k], k), 4)
+        report[f'ndcg@{k}'] = round(ndcg_at_k(rel, top_idx[:, :k], k), 4)
+        report[f'family_hit@{k}'] = round(family_hit_rate(families, top_idx[:, :k]), 4)
+    return report
+
+
+def latency(retriever, queries, top_n=5, n_queries=200, seed=0):
+    # Satu query per panggilan, seperti recommend_jobs untuk satu pengguna
+    from topk import top_k
+    rng = np.random.default_rng(seed)
+    sample = queries[rng.choice(len(queries), size=min(n_queries, len(queries)), replace=False)]
+    top_k(retriever.scores(sample[:1])[0], top_n)
+    samples = []
+    for row in sample:
+        start = time.perf_counter()
+        top_k(retriever.scores(row[None, :])[0], top_n)
+        samples.append((time.perf_counter() - start) * 1000)
+    return {'latency_p50_ms': round(float(np.percentile(samples, 50)), 4),
+            'latency_p95_ms': round(float(np.percentile(samples, 95)), 4)}
+
+
+def evaluate(retrievers, catalog, ks=(5, 10), top_n=5, n_latency=200):
+    queries = catalog[riasec_types].to_numpy(dtype=np.float32)
+    rel = relevance_matrix(catalog[HIGH_POINT_COLUMNS].fillna(0).to_numpy())
+    families = catalog['Job Family'].fillna('').to_numpy()
+    results = {}
+    for retriever in retrievers:
+        report = quality(retriever, queries, rel, families, ks)
+        report.update(latency(retriever, queries, top_n, n_latency))
+        results[retriever.name] = report
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluasi kualitas retrieval embedding vs baseline cosine RIASEC")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--scaler", default=SCALER_PATH)
+    parser.add_argument("--catalog", default=CATALOG_PATH)
+    parser.add_argument("--index-dir", default=JOB_INDEX_DIR)
+    parser.add_argument("--dtype", default=resources.JOB_INDEX_DTYPE, choices=["float32", "float16", "int8"],
+                        help="Presisi index pekerjaan yang dievaluasi (default sama dengan serving, FM_INDEX_DTYPE)")
+    parser.add_argument("--k", type=int, nargs="+", default=[5, 10])
+    parser.add_argument("--latency-queries", type=int, default=200)
+    parser.add_argument("--out", default=None, help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    import joblib
+    from job_index import load_or_build_mmap_index, model_version
+    from numpy_model import load_embedding_model
+
+    catalog = pd.read_csv(args.catalog)
+    scaler = joblib.load(args.scaler)
+    model = load_embedding_model(args.model)
+    version = model_version(args.model, args.scaler, args.catalog)
+    index = load_or_build_mmap_index(model, scaler, catalog, args.index_dir, version, args.dtype)
+
+    retrievers = [
+        EmbeddingRetriever(model, scaler, index),
+        RawFeatureRetriever(scaler, catalog[riasec_types].to_numpy()),
+    ]
+    results = evaluate(retrievers, catalog, args.k, n_latency=args.latency_queries)
+
+    table = pd.DataFrame(results).T
+    print(f"{len(catalog)} query (katalog), model {os.path.basename(args.model)}, index {args.dtype}\n")
+    print(table.to_string())
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'model': args.model,
+                       'index_dtype': args.dtype, 'results': results}, f, indent=2)
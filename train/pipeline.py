@@ -0,0 +1,280 @@
+import os
+import sys
+import json
+import time
+import shutil
+import inspect
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+
+# ========================
+# Pipeline build data/model inkremental
+# ========================
+# DAG stage: pivot -> merge -> scale -> triplets -> train -> embed_catalog.
+# Kunci tiap stage = hash (kode stage, parameter, isi file input, kunci stage hulu),
+# jadi hanya stage yang basi yang dijalankan ulang. Output stage ditulis ke direktori
+# sementara lalu di-rename (atomik). Artefak serving (model, scaler, katalog, index)
+# dipublikasikan sebagai satu release, dan Model/current.json menunjuk ke release aktif
+# sehingga aplikasi tidak pernah memuat kombinasi scaler/model/katalog yang tidak cocok.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, "../web"))
+from job_index import file_digest
+from numpy_model import PARITY_ATOL
+# Lokasi pointer didefinisikan sekali di resources agar pipeline dan aplikasi selalu sepakat
+from resources import MODEL_DIR, RELEASE_POINTER_NAME as POINTER_NAME
+
+DATASET_DIR = os.path.join(BASE_DIR, "../Dataset")
+STAGE_DIR = os.path.join(MODEL_DIR, ".pipeline")
+RELEASE_DIR = os.path.join(MODEL_DIR, "releases")
+riasec_types = ['Realistic', 'Investigative', 'Artistic', 'Social', 'Enterprising', 'Conventional']
+
+
+# ========================
+# Stage
+# ========================
+def stage_pivot(inputs, out_dir, params):
+    from train_model import pivot_riasec
+    pivot_riasec(pd.read_csv(inputs['riasec'])).to_csv(os.path.join(out_dir, "pivot.csv"), index=False)
+
+
+def stage_merge(inputs, out_dir, params):
+    from train_model import merge_job_family
+    df_pivot = pd.read_csv(os.path.join(inputs['pivot'], "pivot.csv"))
+    occupation_df = pd.read_csv(inputs['occupation'])
+    merge_job_family(df_pivot, occupation_df).to_csv(os.path.join(out_dir, "job_with_family.csv"), index=False)
+
+
+def stage_scale(inputs, out_dir, params):
+    import joblib
+    from sklearn.preprocessing import StandardScaler
+    df = pd.read_csv(os.path.join(inputs['merge'], "job_with_family.csv"))
+    scaler = StandardScaler()
+    np.save(os.path.join(out_dir, "riasec_scaled.npy"), scaler.fit_transform(df[riasec_types]).astype(np.float32))
+    joblib.dump(scaler, os.path.join(out_dir, "scaler.pkl"))
+
+
+def stage_triplets(inputs, out_dir, params):
+    # Daftar tetangga positif/negatif per subset train/val, dipakai sampler batch saat training
+    from train_model import build_neighbor_lists, split_rows
+    data = np.load(os.path.join(inputs['scale'], "riasec_scaled.npy"))
+    train_idx, val_idx = split_rows(len(data), params['validation_fraction'], params['seed'])
+    arrays = {}
+    for subset, idx in (('train', train_idx), ('val', val_idx)):
+        indptr, indices, neg_counts = build_neighbor_lists(data[idx], params['pos_threshold'], params['neg_threshold'])
+        arrays.update({f'{subset}_indptr': indptr, f'{subset}_indices': indices, f'{subset}_neg_counts': neg_counts})
+    np.savez(os.path.join(out_dir, "neighbors.npz"), **arrays)
+
+
+def stage_train(inputs, out_dir, params):
+    from train_model import train_embedding_model
+    data = np.load(os.path.join(inputs['scale'], "riasec_scaled.npy"))
+    with np.load(os.path.join(inputs['triplets'], "neighbors.npz")) as arrays:
+        neighbors = {
+            subset: (arrays[f'{subset}_indptr'], arrays[f'{subset}_indices'], arrays[f'{subset}_neg_counts'])
+            for subset in ('train', 'val')
+        }
+    model, history = train_embedding_model(
+        data,
+        epochs=params['epochs'],
+        batch_size=params['batch_size'],
+        steps_per_epoch=params['steps_per_epoch'],
+        validation_fraction=params['validation_fraction'],
+        seed=params['seed'],
+        neighbors=neighbors,
+        # Mining in-batch harus memakai threshold yang sama dengan daftar tetangga stage triplets
+        pos_threshold=params['pos_threshold'],
+        neg_threshold=params['neg_threshold'],
+        # Checkpoint per kunci stage (out_dir = <kunci>.tmp<pid>): run yang terputus dilanjutkan
+        # pada pemanggilan berikutnya dengan kunci yang sama
+        checkpoint_dir=f"{out_dir.rsplit('.tmp', 1)[0]}.checkpoints",
+        patience=params['patience'],
+    )
+    model.save(os.path.join(out_dir, "embedding_model.h5"))
+    with open(os.path.join(out_dir, "history.json"), 'w') as f:
+        json.dump({k: [float(v) for v in values] for k, values in history.history.items()}, f)
+
+
+def stage_embed_catalog(inputs, out_dir, params):
+    # Ekspor model NumPy + index embedding katalog untuk kombinasi model/scaler/katalog ini
+    import joblib
+    from tensorflow.keras.models import load_model
+    from numpy_model import export_npz, check_parity
+    from job_index import build_job_index, save_job_index, model_version
+    model_path = os.path.join(inputs['train'], "embedding_model.h5")
+    scaler_path = os.path.join(inputs['scale'], "scaler.pkl")
+    catalog_path = os.path.join(inputs['merge'], "job_with_family.csv")
+    keras_model = load_model(model_path, compile=False)
+    numpy_model = export_npz(keras_model, os.path.join(out_dir, "embedding_model.npz"), source_digest=file_digest(model_path))
+    # Serving memakai .npz tanpa TensorFlow; release tidak boleh terbit bila hasilnya menyimpang dari Keras
+    max_diff = check_parity(keras_model, numpy_model)
+    print(f"[embed_catalog] selisih maksimum Keras vs NumPy: {max_diff:.2e}")
+    if max_diff > params['parity_atol']:
+        raise ValueError(f"Paritas model NumPy gagal: {max_diff:.2e} > {params['parity_atol']}")
+    index = build_job_index(keras_model, joblib.load(scaler_path), pd.read_csv(catalog_path),
+                            model_version(model_path, scaler_path, catalog_path))
+    save_job_index(index, os.path.join(out_dir, "job_index.npz"))
+
+
+# (nama, fungsi, dependensi: {nama input: stage hulu atau path file}, nama parameter yang dipakai)
+STAGES = [
+    ('pivot', stage_pivot, {'riasec': os.path.join(DATASET_DIR, "interests_riasec_dataset.csv")}, ()),
+    ('merge', stage_merge, {'pivot': 'pivot', 'occupation': os.path.join(DATASET_DIR, "occupation_dataset.csv")}, ()),
+    ('scale', stage_scale, {'merge': 'merge'}, ()),
+    ('triplets', stage_triplets, {'scale': 'scale'},
+     ('pos_threshold', 'neg_threshold', 'validation_fraction', 'seed')),
+    ('train', stage_train, {'scale': 'scale', 'triplets': 'triplets'},
+     ('epochs', 'batch_size', 'steps_per_epoch', 'validation_fraction', 'seed', 'patience')),
+    ('embed_catalog', stage_embed_catalog, {'train': 'train', 'scale': 'scale', 'merge': 'merge'}, ('parity_atol',)),
+]
+STAGE_NAMES = [name for name, _, _, _ in STAGES]
+
+# Artefak release: nama file di release -> (stage, nama file di output stage)
+RELEASE_FILES = {
+    'embedding_model.h5': ('train', "embedding_model.h5"),
+    'embedding_model.npz': ('embed_catalog', "embedding_model.npz"),
+    'scaler.pkl': ('scale', "scaler.pkl"),
+    'job_with_family.csv': ('merge', "job_with_family.csv"),
+    'job_index.npz': ('embed_catalog', "job_index.npz"),
+}
+
+DEFAULT_PARAMS = {
+    'epochs': 20,
+    'batch_size': 64,
+    'steps_per_epoch': 125,
+    'validation_fraction': 0.2,
+    'seed': 42,
+    'patience': 5,
+    'pos_threshold': 1.0,
+    'neg_threshold': 2.0,
+    'parity_atol': PARITY_ATOL,
+}
+
+
+def _code_digest(fn):
+    # Kode stage + train_model.py: mengubah cara training juga membuat stage basi
+    h = hashlib.sha256(inspect.getsource(fn).encode())
+    h.update(file_digest(os.path.join(BASE_DIR, "train_model.py")).encode())
+    return h.hexdigest()
+
+
+def stage_key(name, fn, deps, param_names, params, upstream_keys):
+    h = hashlib.sha256(name.encode())
+    h.update(_code_digest(fn).encode())
+    h.update(json.dumps({p: params[p] for p in param_names}, sort_keys=True).encode())
+    for dep_name, dep in sorted(deps.items()):
+        value = upstream_keys[dep] if dep in upstream_keys else file_digest(dep)
+        h.update(f"{dep_name}={value}".encode())
+    return h.hexdigest()[:16]
+
+
+def stage_path(name, key, stage_dir=STAGE_DIR):
+    return os.path.join(stage_dir, name, key)
+
+
+def plan(params, stage_dir=STAGE_DIR):
+    # Hitung kunci semua stage tanpa menjalankan apa pun
+    keys = {}
+    for name, fn, deps, param_names in STAGES:
+        keys[name] = stage_key(name, fn, deps, param_names, params, keys)
+    fresh = {name: os.path.isdir(stage_path(name, key, stage_dir)) for name, key in keys.items()}
+    return keys, fresh
+
+
+def run_stage(name, fn, deps, params, key, keys, stage_dir=STAGE_DIR):
+    out_dir = stage_path(name, key, stage_dir)
+    tmp_dir = f"{out_dir}.tmp{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    inputs = {dep_name: stage_path(dep, keys[dep], stage_dir) if dep in keys else dep
+              for dep_name, dep in deps.items()}
+    start = time.perf_counter()
+    try:
+        fn(inputs, tmp_dir, params)
+        with open(os.path.join(tmp_dir, "stage.json"), 'w') as f:
+            json.dump({'stage': name, 'key': key, 'inputs': inputs, 'params': params,
+                       'seconds': round(time.perf_counter() - start, 2),
+                       'created_at': time.strftime('%Y-%m-%dT%H:%M:%S')}, f, indent=2)
+        # Direktori stage hanya muncul bila seluruh output sudah lengkap
+        os.rename(tmp_dir, out_dir)
+        # Checkpoint resume hanya berguna untuk run yang terputus
+        shutil.rmtree(f"{out_dir}.checkpoints", ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return time.perf_counter() - start
+
+
+def run_pipeline(params, force=(), stage_dir=STAGE_DIR, log=print):
+    keys = {}
+    ran = set()
+    for name, fn, deps, param_names in STAGES:
+        key = keys[name] = stage_key(name, fn, deps, param_names, params, keys)
+        out_dir = stage_path(name, key, stage_dir)
+        # Stage yang dipaksa jalan ulang ikut memaksa stage hilirnya
+        rerun = name in force or any(dep in ran for dep in deps.values())
+        if os.path.isdir(out_dir) and not rerun:
+            log(f"[{name}] segar ({key}), dilewati")
+            continue
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
+        log(f"[{name}] menjalankan ({key})...")
+        seconds = run_stage(name, fn, deps, params, key, keys, stage_dir)
+        log(f"[{name}] selesai dalam {seconds:.1f} detik")
+        ran.add(name)
+    return keys
+
+
+def release(keys, stage_dir=STAGE_DIR, release_dir=RELEASE_DIR, model_dir=MODEL_DIR):
+    # Salin artefak serving ke Model/releases/<kunci>/, lalu ganti pointer current.json secara atomik
+    release_key = keys['embed_catalog']
+    target = os.path.join(release_dir, release_key)
+    if not os.path.isdir(target):
+        tmp_dir = f"{target}.tmp{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for filename, (stage, source) in RELEASE_FILES.items():
+            shutil.copy2(os.path.join(stage_path(stage, keys[stage], stage_dir), source), os.path.join(tmp_dir, filename))
+        os.rename(tmp_dir, target)
+
+    pointer_path = os.path.join(model_dir, POINTER_NAME)
+    pointer = {
+        'release': release_key,
+        'stages': keys,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        # Path relatif terhadap direktori pointer, di mana pun release_dir berada
+        'files': {
+            name: os.path.relpath(os.path.join(target, filename), os.path.dirname(os.path.abspath(pointer_path)))
+            for name, filename in (('model', "embedding_model.h5"), ('scaler', "scaler.pkl"),
+                                   ('catalog', "job_with_family.csv"))
+        },
+    }
+    os.makedirs(model_dir, exist_ok=True)
+    with open(f"{pointer_path}.tmp", 'w') as f:
+        json.dump(pointer, f, indent=2)
+    os.replace(f"{pointer_path}.tmp", pointer_path)
+    return target
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build data/model inkremental berbasis hash isi")
+    for name, default in DEFAULT_PARAMS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(default), default=default)
+    parser.add_argument("--force", nargs="*", default=[], choices=STAGE_NAMES, help="Jalankan ulang stage tertentu")
+    parser.add_argument("--dry-run", action="store_true", help="Tampilkan stage yang basi tanpa menjalankan")
+    parser.add_argument("--no-release", action="store_true", help="Jangan perbarui Model/current.json")
+    args = parser.parse_args()
+    params = {name: getattr(args, name) for name in DEFAULT_PARAMS}
+
+    if args.dry_run:
+        keys, fresh = plan(params)
+        for name in STAGE_NAMES:
+            print(f"{name:<14} {keys[name]}  {'segar' if fresh[name] and name not in args.force else 'BASI'}")
+        sys.exit(0)
+
+    keys = run_pipeline(params, force=set(args.force))
+    if not args.no_release:
+        target = release(keys)
+        print(f"Release {keys['embed_catalog']} aktif: {target}")
@@ -0,0 +1,259 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import contextlib
+import argparse
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+
+# ========================
+# Sweep hyperparameter model embedding
+# ========================
+# Tiap konfigurasi (arsitektur, margin, threshold triplet) dilatih di worker terpisah
+# dalam process pool. Thread BLAS/TensorFlow per worker dibatasi agar jumlah worker x thread
+# tidak melebihi jumlah core. Tiap model dinilai dari kualitas retrieval (recall@k terhadap
+# tetangga fitur RIASEC mentah, kecocokan Job Family) dan latensi inferensi jalur serving
+# (forward pass NumPy), lalu hasilnya ditulis ke leaderboard CSV.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, "../web"))
+
+CATALOG_PATH = os.path.join(BASE_DIR, "../Dataset/job_with_family.csv")
+SWEEP_DIR = os.path.join(BASE_DIR, "../Model/sweep")
+riasec_types = ['Realistic', 'Investigative', 'Artistic', 'Social', 'Enterprising', 'Conventional']
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+                   "TF_NUM_INTRAOP_THREADS", "TF_NUM_INTEROP_THREADS")
+
+
+def config_id(config):
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:10]
+
+
+def expand_grid(grid):
+    # {'embedding_dim': [8, 16], 'dropout': [0.0, 0.3]} -> daftar dict konfigurasi
+    names = list(grid)
+    configs = [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+    # Threshold negatif harus lebih jauh dari threshold positif
+    return [c for c in configs if c['neg_threshold'] > c['pos_threshold']]
+
+
+def parse_hidden(value):
+    # "64,32" -> (64, 32); "" -> tanpa layer tersembunyi
+    return tuple(int(v) for v in value.split(',') if v)
+
+
+# ========================
+# Penilaian
+# ========================
+def _normalize(x):
+    x = np.asarray(x, dtype=np.float32)
+    return x / np.maximum(np.linalg.norm(x, axis=1, keepdims=True), 1e-12)
+
+
+def top_k_neighbors(vectors, query_idx, k):
+    # Tetangga cosine tiap query terhadap seluruh katalog, tanpa dirinya sendiri
+    unit = _normalize(vectors)
+    sims = unit[query_idx] @ unit.T
+    sims[np.arange(len(query_idx)), query_idx] = -np.inf
+    top = np.argpartition(-sims, k, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(sims, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+def retrieval_quality(embeddings, features, families, query_idx, k=10):
+    # recall@k: irisan tetangga di ruang embedding dengan tetangga di ruang fitur mentah
+    predicted = top_k_neighbors(embeddings, query_idx, k)
+    expected = top_k_neighbors(features, query_idx, k)
+    recall = np.mean([len(np.intersect1d(p, e)) / k for p, e in zip(predicted, expected)])
+    family_hits = families[predicted] == families[query_idx][:, None]
+    return {f'recall_at_{k}': round(float(recall), 4),
+            f'family_hit_at_{k}': round(float(family_hits.mean()), 4)}
+
+
+def inference_latency(model, n_features, repeats=200, batch=256):
+    # Latensi satu query (p50/p95) dan throughput batch pada forward pass serving
+    x_single = np.zeros((1, n_features), dtype=np.float32)
+    x_batch = np.zeros((batch, n_features), dtype=np.float32)
+    model.predict(x_single)
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(x_single)
+        samples.append((time.perf_counter() - start) * 1e6)
+    start = time.perf_counter()
+    for _ in range(repeats // 10 or 1):
+        model.predict(x_batch)
+    batch_seconds = (time.perf_counter() - start) / (repeats // 10 or 1)
+    return {'latency_p50_us': round(float(np.percentile(samples, 50)), 1),
+            'latency_p95_us': round(float(np.percentile(samples, 95)), 1),
+            'rows_per_second': round(batch / batch_seconds)}
+
+
+# ========================
+# Worker
+# ========================
+@contextlib.contextmanager
+def worker_thread_env(threads):
+    # Worker spawn mengimport ulang modul ini (termasuk numpy/pandas) sebelum initializer
+    # jalan, jadi batas thread BLAS/OpenMP harus sudah ada di environment saat proses dibuat
+    saved = {name: os.environ.get(name) for name in THREAD_ENV_VARS + ("TF_CPP_MIN_LOG_LEVEL",)}
+    os.environ.update({name: str(threads) for name in THREAD_ENV_VARS})
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def init_worker(threads):
+    # Pool BLAS yang sudah berjalan dibatasi juga lewat threadpoolctl (dependensi scikit-learn)
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(threads)
+    except ImportError:
+        pass
+    # Thread pool TensorFlow dikonfigurasi sebelum operasi pertama di worker
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def run_config(config, features, families, train_params, k, out_dir):
+    import tensorflow as tf
+    from train_model import train_embedding_model, split_rows
+    from numpy_model import NumpyEmbeddingModel, fold_keras_layers
+
+    tf.keras.utils.set_random_seed(train_params['seed'])
+    start = time.perf_counter()
+    model, history = train_embedding_model(features, verbose=0, **train_params, **config)
+    train_seconds = time.perf_counter() - start
+
+    # Model serving adalah forward pass NumPy hasil lipatan BatchNormalization
+    serving_model = NumpyEmbeddingModel(fold_keras_layers(model))
+    _, val_idx = split_rows(len(features), train_params['validation_fraction'], train_params['seed'])
+    row = {'config_id': config_id(config), **config, 'hidden_units': ','.join(map(str, config['hidden_units']))}
+    row.update(retrieval_quality(serving_model.predict(features), features, families, val_idx, k))
+    row.update(inference_latency(serving_model, features.shape[1]))
+    row.update({
+        'params': model.count_params(),
+        'epochs_run': len(history.history['loss']),
+        'best_val_loss': round(float(min(history.history['val_loss'])), 4),
+        'train_seconds': round(train_seconds, 1),
+    })
+    if out_dir:
+        model.save(os.path.join(out_dir, f"{row['config_id']}.h5"))
+    return row
+
+
+# ========================
+# Leaderboard
+# ========================
+def rank(rows, k, min_recall):
+    # Konfigurasi yang memenuhi kualitas dulu, lalu yang paling kecil dan paling cepat;
+    # sisanya diurutkan dari recall tertinggi
+    board = pd.DataFrame(rows)
+    recall = f'recall_at_{k}'
+    board['meets_quality'] = board[recall] >= min_recall
+    passing = board[board['meets_quality']].sort_values(['params', 'latency_p50_us', recall],
+                                                        ascending=[True, True, False])
+    failing = board[~board['meets_quality']].sort_values(recall, ascending=False)
+    board = pd.concat([passing, failing], ignore_index=True)
+    board.insert(0, 'rank', np.arange(1, len(board) + 1))
+    return board
+
+
+def write_leaderboard(board, path):
+    tmp_path = f"{path}.tmp"
+    board.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def run_sweep(configs, features, families, train_params, workers, threads, k=10,
+              min_recall=0.5, out_dir=SWEEP_DIR, save_models=False, log=print):
+    os.makedirs(out_dir, exist_ok=True)
+    leaderboard_path = os.path.join(out_dir, "leaderboard.csv")
+    rows = []
+    # spawn: worker mengimport TensorFlow sendiri setelah batas thread diset
+    context = multiprocessing.get_context("spawn")
+    with worker_thread_env(threads), ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                                         initializer=init_worker, initargs=(threads,)) as pool:
+        futures = {
+            pool.submit(run_config, config, features, families, train_params, k,
+                        out_dir if save_models else None): config
+            for config in configs
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            config = futures[future]
+            try:
+                row = future.result()
+            except Exception as e:
+                log(f"[{done}/{len(configs)}] {config_id(config)} gagal: {e}")
+                continue
+            rows.append(row)
+            log(f"[{done}/{len(configs)}] {row['config_id']} recall@{k}={row[f'recall_at_{k}']:.3f} "
+                f"params={row['params']} p50={row['latency_p50_us']:.0f}us ({row['train_seconds']:.0f} detik)")
+            # Leaderboard ditulis ulang tiap konfigurasi selesai agar hasil parsial tidak hilang
+            write_leaderboard(rank(rows, k, min_recall), leaderboard_path)
+    return rank(rows, k, min_recall) if rows else pd.DataFrame(), leaderboard_path
+
+
+if __name__ == "__main__":
+    cpu_count = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Sweep hyperparameter model embedding secara paralel")
+    parser.add_argument("--catalog", default=CATALOG_PATH)
+    parser.add_argument("--out-dir", default=SWEEP_DIR)
+    parser.add_argument("--embedding-dim", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--hidden-units", type=parse_hidden, nargs="+", default=[(64, 32), (32, 16), (32,)],
+                        help="Ukuran layer tersembunyi, mis. 64,32")
+    parser.add_argument("--dropout", type=float, nargs="+", default=[0.0, 0.3])
+    parser.add_argument("--margin", type=float, nargs="+", default=[0.5, 1.0])
+    parser.add_argument("--pos-threshold", type=float, nargs="+", default=[1.0])
+    parser.add_argument("--neg-threshold", type=float, nargs="+", default=[2.0])
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--steps-per-epoch", type=int, default=125)
+    parser.add_argument("--patience", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=cpu_count, help="Jumlah proses paralel")
+    parser.add_argument("--threads-per-worker", type=int, default=None,
+                        help="Thread BLAS/TensorFlow per worker (default: core / worker)")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--min-recall", type=float, default=0.5, help="Batas kualitas recall@k")
+    parser.add_argument("--save-models", action="store_true", help="Simpan model tiap konfigurasi (.h5)")
+    args = parser.parse_args()
+
+    configs = expand_grid({
+        'embedding_dim': args.embedding_dim,
+        'hidden_units': args.hidden_units,
+        'dropout': args.dropout,
+        'margin': args.margin,
+        'pos_threshold': args.pos_threshold,
+        'neg_threshold': args.neg_threshold,
+    })
+    workers = max(1, min(args.workers, len(configs)))
+    threads = args.threads_per_worker or max(1, cpu_count // workers)
+
+    from sklearn.preprocessing import StandardScaler
+    df = pd.read_csv(args.catalog)
+    features = StandardScaler().fit_transform(df[riasec_types]).astype(np.float32)
+    families = df['Job Family'].fillna('').to_numpy()
+    train_params = {'epochs': args.epochs, 'steps_per_epoch': args.steps_per_epoch,
+                    'patience': args.patience, 'seed': args.seed, 'validation_fraction': 0.2}
+
+    print(f"{len(configs)} konfigurasi, {workers} worker x {threads} thread")
+    start = time.perf_counter()
+    board, path = run_sweep(configs, features, families, train_params, workers, threads, args.k,
+                            args.min_recall, args.out_dir, args.save_models)
+    print(f"\nSelesai dalam {time.perf_counter() - start:.0f} detik, leaderboard: {path}")
+    if len(board):
+        columns = ['rank', 'config_id', 'embedding_dim', 'hidden_units', 'dropout', 'margin',
+                   f'recall_at_{args.k}', f'family_hit_at_{args.k}', 'params', 'latency_p50_us', 'meets_quality']
+        print(board[columns].head(10).to_string(index=False))
@@ -1,3 +1,8 @@
+import os
+import json
+import shutil
+import hashlib
+import argparse
 import tensorflow as tf
 import numpy as np
 import pandas as pd
@@ -6,118 +11,280 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import joblib
 
+riasec_types = ['Realistic', 'Investigative', 'Artistic', 'Social', 'Enterprising', 'Conventional']
+
 # ========================
 # 1. Load dan Preprocessing Data
 # ========================
-riasec_df = pd.read_csv("Dataset/interests_riasec_dataset.csv")
-occupation_df = pd.read_csv("Dataset/occupation_dataset.csv")
-occupation_df = occupation_df.rename(columns={'Code': 'O*NET-SOC Code'})
-occupation_df = occupation_df[['O*NET-SOC Code', 'Job Family']].drop_duplicates()
+def pivot_riasec(riasec_df):
+    # Format panjang (satu baris per elemen RIASEC) -> satu baris per pekerjaan
+    return riasec_df[['O*NET-SOC Code', 'Title', 'Element Name', 'Data Value']] \
+        .pivot_table(index=['O*NET-SOC Code', 'Title'], columns='Element Name', values='Data Value') \
+        .reset_index()
 
-# Pivot dan gabungkan job family
-df_pivot = riasec_df[['O*NET-SOC Code', 'Title', 'Element Name', 'Data Value']] \
-    .pivot_table(index=['O*NET-SOC Code', 'Title'], columns='Element Name', values='Data Value') \
-    .reset_index()
+def merge_job_family(df_pivot, occupation_df):
+    occupation_df = occupation_df.rename(columns={'Code': 'O*NET-SOC Code'})
+    occupation_df = occupation_df[['O*NET-SOC Code', 'Job Family']].drop_duplicates()
+    return df_pivot.merge(occupation_df, on='O*NET-SOC Code', how='left')
 
-# Gabungkan dengan job family
-df_pivot = df_pivot.merge(occupation_df, on='O*NET-SOC Code', how='left')
+def load_data():
+    riasec_df = pd.read_csv("Dataset/interests_riasec_dataset.csv")
+    occupation_df = pd.read_csv("Dataset/occupation_dataset.csv")
 
-# ✅ Simpan hasil merge
-df_pivot.to_csv("Dataset/job_with_family.csv", index=False)
-
-riasec_types = ['Realistic', 'Investigative', 'Artistic', 'Social', 'Enterprising', 'Conventional']
-df_pivot = df_pivot[['O*NET-SOC Code', 'Title', 'Job Family'] + riasec_types]
+    # Pivot dan gabungkan job family
+    df_pivot = merge_job_family(pivot_riasec(riasec_df), occupation_df)
 
-scaler = StandardScaler()
-riasec_scaled = scaler.fit_transform(df_pivot[riasec_types])
+    # ✅ Simpan hasil merge
+    df_pivot.to_csv("Dataset/job_with_family.csv", index=False)
 
-# Simpan scaler
-joblib.dump(scaler, "Model/scaler.pkl")
+    return df_pivot[['O*NET-SOC Code', 'Title', 'Job Family'] + riasec_types]
 
 # ========================
 # 2. Model Embedding
 # ========================
-def create_embedding_model(input_dim=6, embedding_dim=16):
+def create_embedding_model(input_dim=6, embedding_dim=16, hidden_units=(64, 32), dropout=0.3):
+    # BatchNormalization + Dropout setelah layer tersembunyi pertama (default = arsitektur awal)
     inputs = tf.keras.Input(shape=(input_dim,))
-    x = tf.keras.layers.Dense(64, activation='relu')(inputs)
-    x = tf.keras.layers.BatchNormalization()(x)
-    x = tf.keras.layers.Dropout(0.3)(x)
-    x = tf.keras.layers.Dense(32, activation='relu')(x)
+    x = inputs
+    for i, units in enumerate(hidden_units):
+        x = tf.keras.layers.Dense(units, activation='relu')(x)
+        if i == 0:
+            x = tf.keras.layers.BatchNormalization()(x)
+            if dropout > 0:
+                x = tf.keras.layers.Dropout(dropout)(x)
     outputs = tf.keras.layers.Dense(embedding_dim)(x)
     return tf.keras.Model(inputs, outputs)
 
-embedding_model = create_embedding_model()
-
 # ========================
 # 3. Triplet Sampling
 # ========================
-def generate_triplets(data, n_triplets=10000):
-    triplets = []
-    for _ in range(n_triplets):
-        anchor_idx = np.random.randint(len(data))
-        anchor = data[anchor_idx]
-        dists = np.linalg.norm(data - anchor, axis=1)
-        positive_pool = np.where(dists < 1.0)[0]
-        negative_pool = np.where(dists > 2.0)[0]
-        if len(positive_pool) > 1 and len(negative_pool) > 0:
-            positive_idx = np.random.choice(positive_pool)
-            while positive_idx == anchor_idx:
-                positive_idx = np.random.choice(positive_pool)
-            negative_idx = np.random.choice(negative_pool)
-            triplets.append((anchor, data[positive_idx], data[negative_idx]))
-    return triplets
-
-triplets = generate_triplets(riasec_scaled)
-anchors = np.array([t[0] for t in triplets])
-positives = np.array([t[1] for t in triplets])
-negatives = np.array([t[2] for t in triplets])
+def build_neighbor_lists(data, pos_threshold=1.0, neg_threshold=2.0, chunk_size=256):
+    # Jarak dihitung sekali per blok baris; hasilnya daftar tetangga positif (format CSR)
+    # dan jumlah kandidat negatif per baris, tanpa menyimpan matriks jarak n x n
+    n = len(data)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    indices = []
+    neg_counts = np.empty(n, dtype=np.int64)
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        dists = np.linalg.norm(data[start:stop, None, :] - data[None, :, :], axis=2)
+        pos = dists < pos_threshold
+        pos[np.arange(stop - start), np.arange(start, stop)] = False
+        indices.append(np.nonzero(pos)[1])
+        indptr[start + 1:stop + 1] = pos.sum(axis=1)
+        neg_counts[start:stop] = (dists > neg_threshold).sum(axis=1)
+    np.cumsum(indptr, out=indptr)
+    indices = np.concatenate(indices) if indices else np.empty(0, dtype=np.int64)
+    return indptr, indices, neg_counts
 
 # ========================
-# 4. Triplet Loss
+# 4. Pipeline Batch (tf.data)
 # ========================
-def triplet_loss(margin=1.0):
-    def loss(y_true, y_pred):
-        anchor, positive, negative = y_pred[:, :16], y_pred[:, 16:32], y_pred[:, 32:]
-        pos_dist = tf.reduce_sum(tf.square(anchor - positive), axis=1)
-        neg_dist = tf.reduce_sum(tf.square(anchor - negative), axis=1)
-        return tf.reduce_mean(tf.maximum(pos_dist - neg_dist + margin, 0.0))
-    return loss
+def make_batch_dataset(data, batch_size=64, pos_threshold=1.0, neg_threshold=2.0, seed=0, neighbors=None):
+    # Tiap batch berisi batch_size/2 anchor acak beserta satu positif masing-masing, sehingga
+    # setiap anchor pasti punya positif di dalam batch; negatif ditambang dari baris lain di batch.
+    # Batch diundi on the fly secara paralel dan di-prefetch selagi model dilatih.
+    # neighbors: hasil build_neighbor_lists yang sudah dihitung (mis. dari cache pipeline)
+    data = np.asarray(data, dtype=np.float32)
+    indptr, indices, neg_counts = neighbors or build_neighbor_lists(data, pos_threshold, neg_threshold)
+    pos_counts = np.diff(indptr)
+    eligible = np.flatnonzero((pos_counts > 0) & (neg_counts > 0))
+    if len(eligible) == 0:
+        raise ValueError("Tidak ada anchor dengan pasangan positif dan negatif")
+    n_anchors = batch_size // 2
 
-# ========================
-# 5. Triplet Model Training
-# ========================
-input_anchor = tf.keras.Input(shape=(6,))
-input_positive = tf.keras.Input(shape=(6,))
-input_negative = tf.keras.Input(shape=(6,))
-embedded_anchor = embedding_model(input_anchor)
-embedded_positive = embedding_model(input_positive)
-embedded_negative = embedding_model(input_negative)
-merged_output = tf.keras.layers.Concatenate()([embedded_anchor, embedded_positive, embedded_negative])
-
-triplet_model = tf.keras.Model(inputs=[input_anchor, input_positive, input_negative], outputs=merged_output)
-triplet_model.compile(optimizer='adam', loss=triplet_loss())
-
-history = triplet_model.fit(
-    [anchors, positives, negatives],
-    np.zeros(len(triplets)),
-    epochs=20,
-    batch_size=64,
-    validation_split=0.2,
-    verbose=1
-)
+    def sample_batch(step):
+        rng = np.random.default_rng([seed, int(step)])
+        anchor_idx = rng.choice(eligible, size=n_anchors)
+        offsets = (rng.random(n_anchors) * pos_counts[anchor_idx]).astype(np.int64)
+        positive_idx = indices[indptr[anchor_idx] + offsets]
+        return data[np.concatenate([anchor_idx, positive_idx])]
+
+    def to_batch(step):
+        x = tf.numpy_function(sample_batch, [step], tf.float32)
+        x.set_shape((2 * n_anchors, data.shape[1]))
+        # Target = fitur input, dipakai loss untuk menentukan pasangan positif/negatif
+        return x, x
+
+    return tf.data.Dataset.counter() \
+        .map(to_batch, num_parallel_calls=tf.data.AUTOTUNE) \
+        .prefetch(tf.data.AUTOTUNE)
 
 # ========================
-# 6. Simpan Model Embedding
+# 5. Triplet Loss dengan Online Mining
 # ========================
-embedding_model.save("Model/embedding_model.h5")
+def batch_triplet_loss(margin=1.0, pos_threshold=1.0, neg_threshold=2.0, mining='semi-hard'):
+    # y_true: fitur input terstandardisasi (batch, 6), y_pred: embedding (batch, dim).
+    # Positif/negatif ditentukan dari jarak input (pos_threshold/neg_threshold); untuk tiap anchor
+    # dipakai positif terjauh dan negatif tersulit (batch-hard) atau semi-hard di ruang embedding.
+    def pairwise_sq_dist(x):
+        sq = tf.reduce_sum(tf.square(x), axis=1)
+        return tf.maximum(sq[:, None] - 2.0 * tf.matmul(x, x, transpose_b=True) + sq[None, :], 0.0)
+
+    def loss(y_true, y_pred):
+        input_dist = tf.sqrt(pairwise_sq_dist(y_true) + 1e-12)
+        emb_dist = pairwise_sq_dist(y_pred)
+        not_self = tf.logical_not(tf.eye(tf.shape(y_true)[0], dtype=tf.bool))
+        pos_mask = tf.logical_and(input_dist < pos_threshold, not_self)
+        neg_mask = input_dist > neg_threshold
+
+        big = tf.reduce_max(emb_dist) + margin + 1.0
+        hardest_pos = tf.reduce_max(tf.where(pos_mask, emb_dist, 0.0), axis=1)
+        hardest_neg = tf.reduce_min(tf.where(neg_mask, emb_dist, big), axis=1)
+        if mining == 'semi-hard':
+            # Negatif terdekat yang masih lebih jauh dari positif; jika tidak ada, pakai yang tersulit
+            semi_mask = tf.logical_and(neg_mask, emb_dist > hardest_pos[:, None])
+            semi_neg = tf.reduce_min(tf.where(semi_mask, emb_dist, big), axis=1)
+            neg_dist = tf.where(tf.reduce_any(semi_mask, axis=1), semi_neg, hardest_neg)
+        else:
+            neg_dist = hardest_neg
+
+        valid = tf.cast(tf.logical_and(tf.reduce_any(pos_mask, axis=1), tf.reduce_any(neg_mask, axis=1)), tf.float32)
+        losses = tf.maximum(hardest_pos - neg_dist + margin, 0.0) * valid
+        return tf.reduce_sum(losses) / tf.maximum(tf.reduce_sum(valid), 1.0)
+    return loss
 
 # ========================
-# 7. Plot Loss
+# 6. Training
 # ========================
-plt.plot(history.history['loss'], label='Training Loss')
-plt.plot(history.history['val_loss'], label='Validation Loss')
-plt.title('Training dan Validation Loss')
-plt.xlabel('Epoch')
-plt.ylabel('Loss')
-plt.legend()
-plt.show()
+def checkpoint_key(data, **config):
+    # Identitas run untuk checkpoint: isi data training + konfigurasi yang memengaruhi bobot
+    digest = hashlib.sha256(np.ascontiguousarray(data, dtype=np.float32).tobytes())
+    digest.update(json.dumps(config, sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:16]
+
+def training_callbacks(checkpoint_dir=None, patience=5, resume=True, run_key=None):
+    # EarlyStopping selalu aktif; dengan checkpoint_dir bobot terbaik disimpan tiap kali
+    # val_loss membaik, dan BackupAndRestore menyimpan state per epoch untuk melanjutkan run yang terputus
+    callbacks = [tf.keras.callbacks.EarlyStopping(monitor='val_loss', patience=patience, restore_best_weights=True)]
+    if checkpoint_dir is None:
+        return callbacks, None
+
+    backup_dir = os.path.join(checkpoint_dir, "backup")
+    best_path = os.path.join(checkpoint_dir, "best.weights.h5")
+    best_log = os.path.join(checkpoint_dir, "best.json")
+    run_log = os.path.join(checkpoint_dir, "run.json")
+    # Checkpoint hanya dilanjutkan bila run sebelumnya terputus (backup epoch masih ada; dihapus
+    # Keras saat run selesai) dan run_key-nya sama. Selain itu best.json/best.weights.h5 berasal
+    # dari run lain yang selesai atau data/konfigurasi berbeda, jadi dibuang
+    if resume:
+        try:
+            with open(run_log) as f:
+                previous = json.load(f)['key']
+        except (OSError, ValueError, KeyError):
+            previous = None
+        resume = previous == run_key and os.path.isdir(backup_dir) and bool(os.listdir(backup_dir))
+    if not resume:
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    with open(f"{run_log}.tmp", 'w') as f:
+        json.dump({'key': run_key}, f)
+    os.replace(f"{run_log}.tmp", run_log)
+
+    # val_loss terbaik dari run sebelumnya agar checkpoint terbaik tidak ditimpa bobot yang lebih buruk
+    try:
+        with open(best_log) as f:
+            best = json.load(f)['val_loss']
+    except (OSError, ValueError, KeyError):
+        best = None
+    state = {'best': best if best is not None else float('inf')}
+
+    def record_best(epoch, logs):
+        val_loss = (logs or {}).get('val_loss')
+        if val_loss is not None and val_loss < state['best']:
+            state['best'] = float(val_loss)
+            with open(f"{best_log}.tmp", 'w') as f:
+                json.dump({'val_loss': state['best'], 'epoch': epoch + 1}, f)
+            os.replace(f"{best_log}.tmp", best_log)
+
+    callbacks = [
+        tf.keras.callbacks.BackupAndRestore(backup_dir),
+        tf.keras.callbacks.ModelCheckpoint(best_path, monitor='val_loss', save_best_only=True,
+                                           save_weights_only=True, initial_value_threshold=best),
+        tf.keras.callbacks.LambdaCallback(on_epoch_end=record_best),
+    ] + callbacks
+    return callbacks, best_path
+
+def split_rows(n_rows, validation_fraction=0.2, seed=42):
+    # Split baris katalog agar batch validasi tidak berbagi pekerjaan dengan batch training
+    order = np.random.default_rng(seed).permutation(n_rows)
+    n_val = int(n_rows * validation_fraction)
+    return order[n_val:], order[:n_val]
+
+def train_embedding_model(riasec_scaled, epochs=20, batch_size=64, steps_per_epoch=125,
+                          validation_steps=30, validation_fraction=0.2, seed=42, verbose=1,
+                          neighbors=None, checkpoint_dir=None, patience=5, resume=True,
+                          embedding_dim=16, hidden_units=(64, 32), dropout=0.3, margin=1.0,
+                          pos_threshold=1.0, neg_threshold=2.0):
+    # neighbors: {'train': ..., 'val': ...} daftar tetangga per subset bila sudah dihitung
+    # (harus dibangun dengan pos_threshold/neg_threshold yang sama)
+    neighbors = neighbors or {}
+    train_idx, val_idx = split_rows(len(riasec_scaled), validation_fraction, seed)
+    train_ds = make_batch_dataset(riasec_scaled[train_idx], batch_size, pos_threshold, neg_threshold,
+                                  seed=seed, neighbors=neighbors.get('train'))
+    val_ds = make_batch_dataset(riasec_scaled[val_idx], batch_size, pos_threshold, neg_threshold,
+                                seed=seed + 1, neighbors=neighbors.get('val'))
+
+    embedding_model = create_embedding_model(riasec_scaled.shape[1], embedding_dim, hidden_units, dropout)
+    embedding_model.compile(optimizer='adam', loss=batch_triplet_loss(margin, pos_threshold, neg_threshold))
+    run_key = checkpoint_key(
+        riasec_scaled, batch_size=batch_size, steps_per_epoch=steps_per_epoch, validation_steps=validation_steps,
+        validation_fraction=validation_fraction, seed=seed, embedding_dim=embedding_dim, hidden_units=hidden_units,
+        dropout=dropout, margin=margin, pos_threshold=pos_threshold, neg_threshold=neg_threshold
+    )
+    callbacks, best_path = training_callbacks(checkpoint_dir, patience, resume, run_key)
+    history = embedding_model.fit(
+        train_ds,
+        epochs=epochs,
+        steps_per_epoch=steps_per_epoch,
+        validation_data=val_ds,
+        validation_steps=validation_steps,
+        callbacks=callbacks,
+        verbose=verbose
+    )
+    # Bobot terbaik lintas run (termasuk sebelum resume), bukan hanya terbaik di run ini
+    if best_path and os.path.exists(best_path):
+        embedding_model.load_weights(best_path)
+    return embedding_model, history
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Training model embedding RIASEC")
+    parser.add_argument("--epochs", type=int, default=20, help="Jumlah epoch maksimum")
+    parser.add_argument("--patience", type=int, default=5, help="Epoch tanpa perbaikan val_loss sebelum berhenti")
+    # Direktori sendiri, terpisah dari Scripts/train_model.py (Model/checkpoints/triplet)
+    parser.add_argument("--checkpoint-dir", default="Model/checkpoints/embedding")
+    parser.add_argument("--resume", action="store_true",
+                        help="Lanjutkan run yang terputus dengan data dan konfigurasi yang sama")
+    args = parser.parse_args()
+
+    df_pivot = load_data()
+
+    scaler = StandardScaler()
+    riasec_scaled = scaler.fit_transform(df_pivot[riasec_types])
+
+    # Simpan scaler
+    joblib.dump(scaler, "Model/scaler.pkl")
+
+    embedding_model, history = train_embedding_model(
+        riasec_scaled,
+        epochs=args.epochs,
+        checkpoint_dir=args.checkpoint_dir,
+        patience=args.patience,
+        resume=args.resume
+    )
+
+    # ========================
+    # 7. Simpan Model Embedding
+    # ========================
+    embedding_model.save("Model/embedding_model.h5")
+
+    # ========================
+    # 8. Plot Loss
+    # ========================
+    plt.plot(history.history['loss'], label='Training Loss')
+    plt.plot(history.history['val_loss'], label='Validation Loss')
+    plt.title('Training dan Validation Loss')
+    plt.xlabel('Epoch')
+    plt.ylabel('Loss')
+    plt.legend()
+    plt.show()
@@ -0,0 +1,389 @@
+import os
+import json
+import time
+import inspect
+import argparse
+import numpy as np
+from job_index import l2_normalize
+from topk import top_k, top_k_rows
+
+# Layer index vektor untuk katalog besar (jabatan alternatif + jabatan yang dilaporkan).
+# Semua jabatan satu okupasi berbagi embedding okupasinya, jadi yang diindeks hanya
+# vektor okupasi (satu per baris JobIndex); hasil search dipetakan ke jabatan lewat
+# daftar jabatan per okupasi (CSR). Dua backend dengan antarmuka sama, search(queries, k) -> (indeks, similarity):
+# - ExactIndex: brute force cosine (acuan recall)
+# - IVFIndex: k-means sferis membagi vektor ke n_lists sel; query hanya memeriksa
+#   nprobe sel terdekat. nprobe besar = recall lebih tinggi, latensi lebih besar.
+
+ANN_FORMAT = 2
+TITLE_SOURCES = {
+    'Alternate Titles': 'Alternate Title',
+    'Sample of Reported Titles': 'Reported Job Title',
+}
+
+
+class ExactIndex:
+    kind = 'exact'
+
+    def __init__(self, vectors):
+        self.vectors = l2_normalize(vectors)
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def search(self, queries, k):
+        queries = l2_normalize(np.atleast_2d(queries))
+        return top_k_rows(queries @ self.vectors.T, k)
+
+    def arrays(self):
+        return {'vectors': self.vectors}
+
+    @classmethod
+    def from_arrays(cls, data, **params):
+        index = cls.__new__(cls)
+        index.vectors = data['vectors']
+        return index
+
+
+def spherical_kmeans(vectors, n_clusters, n_iter=20, seed=0):
+    # k-means pada vektor ternormalisasi dengan similarity cosine; centroid dinormalisasi ulang tiap iterasi
+    rng = np.random.default_rng(seed)
+    unique = np.unique(vectors, axis=0)
+    n_clusters = min(n_clusters, len(unique))
+    centroids = unique[rng.choice(len(unique), n_clusters, replace=False)]
+    assign = np.zeros(len(vectors), dtype=np.int64)
+    for _ in range(n_iter):
+        new_assign = np.argmax(vectors @ centroids.T, axis=1)
+        if np.array_equal(new_assign, assign) and _ > 0:
+            break
+        assign = new_assign
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        empty = np.flatnonzero(np.bincount(assign, minlength=n_clusters) == 0)
+        # Sel kosong diisi ulang dengan vektor acak agar semua sel terpakai
+        sums[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+        centroids = l2_normalize(sums)
+    return centroids, assign
+
+
+class IVFIndex:
+    kind = 'ivf'
+
+    def __init__(self, vectors, n_lists=None, nprobe=4, n_iter=20, seed=0):
+        self.vectors = l2_normalize(vectors)
+        n_lists = n_lists or max(1, int(np.sqrt(len(self.vectors))))
+        self.centroids, assign = spherical_kmeans(self.vectors, n_lists, n_iter, seed)
+        # Inverted list dalam format CSR: anggota sel c = order[offsets[c]:offsets[c + 1]]
+        self.order = np.argsort(assign, kind='stable').astype(np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=len(self.centroids)))]).astype(np.int64)
+        self.nprobe = nprobe
+
+    def __len__(self):
+        return len(self.vectors)
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    def _candidates(self, cells):
+        return np.concatenate([self.order[self.offsets[c]:self.offsets[c + 1]] for c in cells])
+
+    def search(self, queries, k, nprobe=None):
+        queries = l2_normalize(np.atleast_2d(queries))
+        nprobe = min(nprobe or self.nprobe, self.n_lists)
+        cells, _ = top_k_rows(queries @ self.centroids.T, nprobe)
+        k = min(k, len(self.vectors))
+        idx = np.full((len(queries), k), -1, dtype=np.int64)
+        sims = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for row, query in enumerate(queries):
+            candidates = self._candidates(cells[row])
+            # Kandidat diurutkan agar skor sama dimenangkan baris dengan indeks terkecil
+            candidates.sort()
+            scores = self.vectors[candidates] @ query
+            top = top_k(scores, k)
+            idx[row, :len(top)] = candidates[top]
+            sims[row, :len(top)] = scores[top]
+        return idx, sims
+
+    def arrays(self):
+        return {
+            'vectors': self.vectors,
+            'centroids': self.centroids,
+            'order': self.order,
+            'offsets': self.offsets,
+            'nprobe': np.array(self.nprobe),
+        }
+
+    @classmethod
+    def from_arrays(cls, data, nprobe=None):
+        index = cls.__new__(cls)
+        index.vectors = data['vectors']
+        index.centroids = data['centroids']
+        index.order = data['order']
+        index.offsets = data['offsets']
+        index.nprobe = nprobe or int(data['nprobe'])
+        return index
+
+
+BACKENDS = {cls.kind: cls for cls in (ExactIndex, IVFIndex)}
+
+
+def backend(kind):
+    if kind not in BACKENDS:
+        raise ValueError(f"Backend index '{kind}' tidak dikenal, pilih salah satu dari {sorted(BACKENDS)}")
+    return BACKENDS[kind]
+
+
+def make_index(kind, vectors, **params):
+    return backend(kind)(vectors, **params)
+
+
+class TitleCatalog:
+    # Satu baris per jabatan (judul okupasi, jabatan alternatif, jabatan yang dilaporkan).
+    # occupation_idx = baris okupasinya di JobIndex (= baris vektor di index).
+
+    def __init__(self, titles, codes, occupation_idx, sources):
+        self.titles = titles
+        self.codes = codes
+        self.occupation_idx = occupation_idx
+        self.sources = sources
+
+    def __len__(self):
+        return len(self.titles)
+
+    def arrays(self):
+        return {
+            'titles': self.titles,
+            'codes': self.codes,
+            'occupation_idx': self.occupation_idx,
+            'sources': self.sources,
+        }
+
+
+def build_title_catalog(job_index, tables=None):
+    # tables: {nama tabel: DataFrame}; default dibaca dari cache Parquet O*NET
+    import pandas as pd
+    if tables is None:
+        from onet_cache import load_table
+        tables = {name: load_table(name, columns=['O*NET-SOC Code', column]) for name, column in TITLE_SOURCES.items()}
+
+    frames = [pd.DataFrame({'code': job_index.codes, 'title': job_index.titles, 'source': 'Occupation'})]
+    for name, column in TITLE_SOURCES.items():
+        table = tables[name]
+        frames.append(pd.DataFrame({
+            'code': table['O*NET-SOC Code'].astype(str).to_numpy(),
+            'title': table[column].astype(str).to_numpy(),
+            'source': name,
+        }))
+    frame = pd.concat(frames, ignore_index=True)
+    frame = frame[frame['title'].str.strip() != '']
+
+    position = pd.Series(np.arange(len(job_index.codes)), index=job_index.codes)
+    frame = frame[frame['code'].isin(position.index)]
+    # Jabatan yang sama untuk okupasi yang sama cukup disimpan sekali
+    frame = frame.loc[~frame.assign(key=frame['title'].str.lower()).duplicated(subset=['code', 'key'])]
+    return TitleCatalog(
+        titles=frame['title'].to_numpy(dtype=str),
+        codes=frame['code'].to_numpy(dtype=str),
+        occupation_idx=position.loc[frame['code']].to_numpy(dtype=np.int32),
+        sources=frame['source'].to_numpy(dtype=str),
+    )
+
+
+class TitleIndex:
+    def __init__(self, catalog, index, job_version, build_key=''):
+        self.catalog = catalog
+        self.index = index
+        self.job_version = job_version
+        self.build_key = build_key
+        # Jabatan per okupasi: baris katalog okupasi o = order[offsets[o]:offsets[o + 1]],
+        # judul okupasi sendiri lebih dulu karena urutan katalog dipertahankan (stable)
+        self._order = np.argsort(catalog.occupation_idx, kind='stable')
+        self._offsets = np.concatenate([[0], np.cumsum(np.bincount(catalog.occupation_idx, minlength=len(index)))])
+
+    def __len__(self):
+        return len(self.catalog)
+
+    def titles_of(self, occupation, limit=None):
+        rows = self._order[self._offsets[occupation]:self._offsets[occupation + 1]]
+        return rows[:limit] if limit else rows
+
+    def search(self, user_embed, k=10, per_occupation=None, **params):
+        # k jabatan teratas per query; jabatan mewarisi similarity okupasinya.
+        # Setiap okupasi punya minimal satu jabatan, jadi k okupasi teratas sudah cukup.
+        occ_idx, occ_sims = self.index.search(user_embed, k, **params)
+        idx = np.full((len(occ_idx), k), -1, dtype=np.int64)
+        sims = np.full((len(occ_idx), k), -np.inf, dtype=np.float32)
+        for row in range(len(occ_idx)):
+            found = [(self.titles_of(o, per_occupation), s) for o, s in zip(occ_idx[row], occ_sims[row]) if o >= 0]
+            if not found:
+                continue
+            rows = np.concatenate([titles for titles, _ in found])[:k]
+            idx[row, :len(rows)] = rows
+            sims[row, :len(rows)] = np.repeat([s for _, s in found], [len(t) for t, _ in found])[:k]
+        return idx, sims
+
+    def lookup(self, idx, sims):
+        return [
+            {
+                'Title': str(self.catalog.titles[i]),
+                'O*NET-SOC Code': str(self.catalog.codes[i]),
+                'Source': str(self.catalog.sources[i]),
+                'Similarity Score': round(float(s), 3),
+            }
+            for i, s in zip(idx, sims) if i >= 0
+        ]
+
+
+# Parameter search-time: nilainya disimpan di artefak sebagai default, tetapi bukan bagian
+# kunci build, sehingga mengubahnya tidak membangun ulang index
+SEARCH_PARAMS = ('nprobe',)
+
+
+def search_params(params):
+    return {name: value for name, value in params.items() if name in SEARCH_PARAMS}
+
+
+def build_key(kind, **params):
+    # Parameter build (dilengkapi default backend) menentukan artefak: index lama dengan
+    # n_lists/n_iter/seed lain dibangun ulang
+    bound = inspect.signature(backend(kind)).bind_partial(**params)
+    bound.apply_defaults()
+    values = {name: value for name, value in bound.arguments.items() if name not in SEARCH_PARAMS}
+    return json.dumps({'kind': kind, **values}, sort_keys=True)
+
+
+def saved_params(path):
+    # (kind, params) artefak tersimpan: parameter build dari build_key plus nprobe yang disimpan
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            params = json.loads(str(data['build_key']))
+            for name in SEARCH_PARAMS:
+                if f'index_{name}' in data.files:
+                    params[name] = data[f'index_{name}'].item()
+    except (OSError, KeyError, ValueError, TypeError):
+        return None
+    return params.pop('kind'), params
+
+
+def build_title_index(job_index, kind='ivf', catalog=None, **params):
+    catalog = catalog or build_title_catalog(job_index)
+    index = make_index(kind, job_index.dense_embeddings(), **params)
+    return TitleIndex(catalog, index, job_index.version, build_key(kind, **params))
+
+
+def save_title_index(title_index, path):
+    arrays = {f'index_{k}': v for k, v in title_index.index.arrays().items()}
+    arrays.update({f'catalog_{k}': v for k, v in title_index.catalog.arrays().items()})
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(
+        tmp_path,
+        kind=np.array(title_index.index.kind),
+        job_version=np.array(title_index.job_version),
+        build_key=np.array(title_index.build_key),
+        format=np.array(ANN_FORMAT),
+        **arrays,
+    )
+    os.replace(tmp_path, path)
+
+
+def load_title_index(path, job_version=None, key=None, **params):
+    # job_version: versi JobIndex saat ini; artefak dari model lama dianggap basi.
+    # key: hasil build_key; artefak dengan parameter build berbeda juga dianggap basi.
+    # params: override parameter search-time (nprobe)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['format']) != ANN_FORMAT:
+                return None
+            if job_version is not None and str(data['job_version']) != job_version:
+                return None
+            if key is not None and str(data['build_key']) != key:
+                return None
+            parts = {'index_': {}, 'catalog_': {}}
+            for key_name in data.files:
+                for prefix, values in parts.items():
+                    if key_name.startswith(prefix):
+                        values[key_name[len(prefix):]] = data[key_name]
+            index = BACKENDS[str(data['kind'])].from_arrays(parts['index_'], **search_params(params))
+            return TitleIndex(TitleCatalog(**parts['catalog_']), index, str(data['job_version']), str(data['build_key']))
+    except (KeyError, ValueError, TypeError):
+        return None
+
+
+def load_or_build_title_index(job_index, path, kind=None, **params):
+    # kind=None (serving): parameter diambil dari artefak yang ada, mis. hasil tuning CLI; bila
+    # artefak basi (model baru) index dibangun ulang dengan parameter yang sama. params di sini
+    # hanya override search-time (nprobe). Dengan kind, artefak harus cocok dengan kind/params.
+    if kind is None:
+        title_index = load_title_index(path, job_index.version, **params)
+        if title_index is not None:
+            return title_index
+        kind, saved = saved_params(path) or ('ivf', {})
+        accepted = inspect.signature(backend(kind)).parameters
+        params = {name: value for name, value in {**saved, **params}.items() if name in accepted}
+    else:
+        title_index = load_title_index(path, job_index.version, build_key(kind, **params), **params)
+        if title_index is not None:
+            return title_index
+    title_index = build_title_index(job_index, kind, **params)
+    try:
+        save_title_index(title_index, path)
+    except OSError:
+        pass
+    return title_index
+
+
+def recall_report(approx, exact, queries, k=10, **params):
+    # Recall@k berbasis similarity: hasil approx dihitung benar bila similarity-nya
+    # tidak lebih kecil dari similarity ke-k brute force (adil untuk vektor kembar).
+    start = time.perf_counter()
+    exact_idx, exact_sims = exact.search(queries, k)
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    start = time.perf_counter()
+    approx_idx, approx_sims = approx.search(queries, k, **params)
+    approx_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    kth = exact_sims[:, -1:] - 1e-6
+    hits = ((approx_sims >= kth) & (approx_idx >= 0)).sum(axis=1)
+    return {
+        'k': k,
+        'recall': round(float(np.mean(hits / exact_idx.shape[1])), 4),
+        'exact_ms_per_query': round(exact_ms, 4),
+        'approx_ms_per_query': round(approx_ms, 4),
+        **params,
+    }
+
+
+if __name__ == "__main__":
+    import resources
+
+    parser = argparse.ArgumentParser(description="Bangun index jabatan (alternatif + dilaporkan) dan laporan recall@k")
+    parser.add_argument("--out", default=resources.TITLE_INDEX_PATH)
+    parser.add_argument("--kind", default="ivf", choices=sorted(BACKENDS))
+    parser.add_argument("--n-lists", type=int, default=None, help="Jumlah sel IVF (default sqrt(jumlah okupasi))")
+    parser.add_argument("--nprobe", type=int, default=4, help="Sel yang diperiksa per query (default saat serving)")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=1000, help="Jumlah profil RIASEC acak untuk laporan recall")
+    args = parser.parse_args()
+
+    job_index = resources.get_job_index()
+    start = time.perf_counter()
+    params = {'n_lists': args.n_lists, 'nprobe': args.nprobe} if args.kind == 'ivf' else {}
+    title_index = build_title_index(job_index, args.kind, **params)
+    save_title_index(title_index, args.out)
+    print(f"Index {args.kind} {len(title_index.index)} okupasi / {len(title_index)} jabatan dibangun dalam "
+          f"{time.perf_counter() - start:.2f} detik -> {args.out}")
+
+    # Query = embedding profil RIASEC acak pada skala 1-5
+    rng = np.random.default_rng(0)
+    scaler = resources.get_scaler()
+    profiles = rng.uniform(1, 5, size=(args.queries, len(scaler.mean_)))
+    queries = resources.get_model().predict(((profiles - scaler.mean_) / scaler.scale_).astype(np.float32), verbose=0)
+    exact = ExactIndex(title_index.index.vectors)
+    if args.kind == 'ivf':
+        for nprobe in sorted({1, 2, 4, 8, 16, args.nprobe}):
+            if nprobe <= title_index.index.n_lists:
+                print(recall_report(title_index.index, exact, queries, args.k, nprobe=nprobe))
+    else:
+        print(recall_report(title_index.index, exact, queries, args.k))
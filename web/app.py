@@ -1,79 +1,32 @@
+import io
 import os
+import json
 import time
-import base64
-import joblib
+import atexit
+import hashlib
 import tempfile
+import functools
 import numpy as np
 import pandas as pd
 from fpdf import FPDF
 from PIL import Image
 import streamlit as st
 from datetime import datetime
-import matplotlib.pyplot as plt
+import matplotlib
+# Backend non-interaktif diinisialisasi sekali; chart dirender tanpa state global pyplot
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
 from matplotlib.path import Path
 from matplotlib.patches import PathPatch
-from tensorflow.keras.models import load_model
+import resources
+import metrics
+from questionnaire import questions, score_answers, scores_dict
+from topk import RecommendationCursor
 
 # Load model dan scaler
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 riasec_types_list = ['Realistic', 'Investigative', 'Artistic', 'Social', 'Enterprising', 'Conventional']
 
-# Data pertanyaan RIASEC yang diperbarui
-questions = [
-    {"question": "Saya suka bekerja dengan alat, mesin, atau tanaman.", "type": "R"},
-    {"question": "Saya senang menyelidiki masalah atau memecahkan teka-teki.", "type": "I"},
-    {"question": "Saya suka menggambar, melukis, atau menulis cerita.", "type": "A"},
-    {"question": "Saya menikmati membantu orang menyelesaikan masalah.", "type": "S"},
-    {"question": "Saya suka memimpin proyek atau orang.", "type": "E"},
-    {"question": "Saya menikmati bekerja dengan data atau angka.", "type": "C"},
-    {"question": "Saya menikmati aktivitas fisik atau pekerjaan lapangan.", "type": "R"},
-    {"question": "Saya suka menganalisis informasi dan melakukan eksperimen.", "type": "I"},
-    {"question": "Saya suka tampil di depan umum seperti berakting atau menyanyi.", "type": "A"},
-    {"question": "Saya senang mengajar atau melatih orang lain.", "type": "S"},
-    {"question": "Saya suka menjual atau mempromosikan ide atau produk.", "type": "E"},
-    {"question": "Saya suka pekerjaan yang melibatkan rutinitas dan struktur.", "type": "C"},
-    {"question": "Saya suka menggunakan alat atau kendaraan.", "type": "R"},
-    {"question": "Saya penasaran dengan bagaimana sesuatu bekerja.", "type": "I"},
-    {"question": "Saya suka mendesain atau membuat hal kreatif.", "type": "A"},
-    {"question": "Saya suka mendengarkan masalah orang dan membantu mereka.", "type": "S"},
-    {"question": "Saya suka mengambil keputusan dan mengambil risiko.", "type": "E"},
-    {"question": "Saya suka mengatur data atau menyusun informasi.", "type": "C"},
-    {"question": "Saya suka membangun atau memperbaiki sesuatu.", "type": "R"},
-    {"question": "Saya suka memecahkan masalah menggunakan logika.", "type": "I"},
-    {"question": "Saya suka menulis puisi, cerita, atau lagu.", "type": "A"},
-    {"question": "Saya suka menjadi sukarelawan dalam kegiatan sosial.", "type": "S"},
-    {"question": "Saya suka menjadi pemimpin dalam kelompok.", "type": "E"},
-    {"question": "Saya suka bekerja dengan komputer dan angka.", "type": "C"},
-    {"question": "Saya senang menggunakan kekuatan atau ketangkasan saya.", "type": "R"},
-    {"question": "Saya suka bertanya dan mengeksplorasi hal baru.", "type": "I"},
-    {"question": "Saya suka membuat karya seni atau musik.", "type": "A"},
-    {"question": "Saya suka mendengarkan dan memberi nasihat.", "type": "S"},
-    {"question": "Saya suka mengatur orang untuk mencapai tujuan.", "type": "E"},
-    {"question": "Saya suka bekerja dengan detail dan mengikuti instruksi.", "type": "C"},
-    {"question": "Saya suka bekerja di luar ruangan.", "type": "R"},
-    {"question": "Saya suka meneliti dan menganalisis masalah.", "type": "I"},
-    {"question": "Saya suka mengekspresikan diri melalui seni atau drama.", "type": "A"},
-    {"question": "Saya suka membimbing dan mengajar orang.", "type": "S"},
-    {"question": "Saya suka meyakinkan orang lain untuk membeli sesuatu.", "type": "E"},
-    {"question": "Saya suka menyusun laporan atau membuat tabel data.", "type": "C"},
-    {"question": "Saya suka menggunakan peralatan atau instrumen.", "type": "R"},
-    {"question": "Saya suka memecahkan teka-teki logika.", "type": "I"},
-    {"question": "Saya suka bermain musik atau menari.", "type": "A"},
-    {"question": "Saya suka membantu orang mengembangkan diri.", "type": "S"},
-    {"question": "Saya suka menjadi pemimpin proyek.", "type": "E"},
-    {"question": "Saya suka pekerjaan administratif atau perkantoran.", "type": "C"}
-]
-
-# Indeks pertanyaan untuk setiap tipe RIASEC
-riasec_index = {
-    'R': [0, 6, 12, 18, 24, 30, 36],
-    'I': [1, 7, 13, 19, 25, 31, 37],
-    'A': [2, 8, 14, 20, 26, 32, 38],
-    'S': [3, 9, 15, 21, 27, 33, 39],
-    'E': [4, 10, 16, 22, 28, 34, 40],
-    'C': [5, 11, 17, 23, 29, 35, 41]
-}
-
 # Deskripsi tipe kepribadian RIASEC
 riasec_types = {
     "R": {
@@ -122,35 +75,94 @@ theme = {
     "input_border": "none"
 }
 
-def recommend_jobs(user_scores, top_n=5):
+def score_jobs(user_scores):
     user_df = pd.DataFrame([user_scores], columns=riasec_types_list)
-    scaled = st.session_state.scaler.transform(user_df)
-    user_embed = st.session_state.model.predict(scaled)
-    job_embed = st.session_state.model.predict(st.session_state.scaler.transform(st.session_state.df_pivot[riasec_types_list].values))
+    with metrics.span('scale'):
+        scaled = resources.get_scaler().transform(user_df)
+    with metrics.span('model_predict'):
+        user_embed = resources.get_model().predict(scaled)
+    with metrics.span('similarity'):
+        return resources.get_job_index().similarities(user_embed)
 
-    user_norm = np.linalg.norm(user_embed, axis=1, keepdims=True)
-    job_norm = np.linalg.norm(job_embed, axis=1, keepdims=True)
-    sim = np.dot(job_embed, user_embed.T) / (job_norm * user_norm.T + 1e-8)
-    sim = sim.flatten()
-    
-    top_idx = sim.argsort()[-top_n:][::-1]
-    result = st.session_state.df_pivot.iloc[top_idx][['Title', 'Job Family']].copy()
+def jobs_frame(user_scores, sim, top_idx):
+    user_df = pd.DataFrame([user_scores], columns=riasec_types_list)
+    result = resources.get_catalog().iloc[top_idx][['Title', 'Job Family']].copy()
     result['Similarity Score'] = sim[top_idx]
     result['Similarity Score'] = result['Similarity Score'].round(3)
     top_dim = user_df.iloc[0].sort_values(ascending=False).head(2).index.tolist()
     result['Alasan'] = f"Skor tertinggi Anda pada dimensi {top_dim[0]} dan {top_dim[1]}"
     return result.reset_index(drop=True)
 
-def create_riasec_chart(scores, dark_mode=False):
+SKILL_PANEL_FAMILIES = {'skills': "Skill", 'knowledge': "Pengetahuan", 'abilities': "Kemampuan"}
+
+def top_skills(codes, n=5):
+    # Elemen O*NET terpenting per pekerjaan dari feature store (importance & level)
+    store = resources.get_feature_store()
+    return {
+        code: {family: store[family].top_elements(code, n) for family in SKILL_PANEL_FAMILIES if family in store}
+        for code in codes
+    }
+
+def render_skill_panel(top_idx):
+    # Store dibangun offline (web/feature_store.py); belum ada atau gagal dimuat = panel tidak ditampilkan
+    if not resources.get_feature_store():
+        return
+    jobs = resources.get_catalog().iloc[top_idx]
+    with metrics.span('skill_panel'):
+        skills = top_skills(jobs['O*NET-SOC Code'].tolist())
+    with st.expander("Skill yang perlu dikembangkan untuk tiap karier"):
+        for code, title in zip(jobs['O*NET-SOC Code'], jobs['Title']):
+            sections = [
+                f"**{SKILL_PANEL_FAMILIES[family]}:** " + ", ".join(
+                    f"{name} (level {level:.1f}/7)" for name, importance, level in elements)
+                for family, elements in skills[code].items() if elements
+            ]
+            if sections:
+                st.markdown(f"**{title}**  \n" + "  \n".join(sections))
+
+def render_related_panel(top_idx):
+    # "Jelajahi karier serupa": tetangga langsung dan 2-hop dari graf CSR, tanpa hitung similarity.
+    # Graf dibangun offline (web/related_graph.py); belum ada atau basi = panel tidak ditampilkan
+    graph = resources.get_related_graph()
+    if graph is None:
+        return
+    jobs = resources.get_catalog().iloc[top_idx]
+    with st.expander("Jelajahi karier serupa"):
+        codes = dict(zip(jobs['Title'], jobs['O*NET-SOC Code']))
+        code = codes[st.selectbox("Pilih karier", list(codes), key="related_career")]
+        with metrics.span('related_graph'):
+            related = pd.DataFrame(graph.neighbors(code, 10))
+            two_hop = pd.DataFrame(graph.two_hop(code, 10))
+        if not related.empty:
+            st.markdown("**Karier terkait langsung**")
+            st.dataframe(related[['Title', 'Relatedness', 'Similarity Score']], hide_index=True)
+        if not two_hop.empty:
+            st.markdown("**Dua langkah dari karier ini**")
+            st.dataframe(two_hop[['Title', 'Paths', 'Similarity Score']], hide_index=True)
+
+def recommend_jobs(user_scores, top_n=5):
+    sim = score_jobs(user_scores)
+    cursor = RecommendationCursor(sim, page_size=top_n)
+    return jobs_frame(user_scores, sim, cursor.next_page())
+
+CHART_CACHE_SIZE = 128
+
+def create_riasec_chart(scores, dark_mode=False, dpi=100):
+    # Skor dikuantisasi ke 2 desimal (sama dengan tampilan) sebagai kunci memo
+    values = tuple(round(float(scores[t]), 2) for t in ['R', 'I', 'A', 'S', 'E', 'C'])
+    return _render_riasec_chart(values, bool(dark_mode), dpi)
+
+@functools.lru_cache(maxsize=CHART_CACHE_SIZE)
+def _render_riasec_chart(values, dark_mode, dpi):
     types = ['R', 'I', 'A', 'S', 'E', 'C']
     labels = [riasec_types[t]['name'] for t in types]
-    colors = [riasec_types[t]['color'] for t in types]
-    values = [scores[t] for t in types]
+    values = list(values)
     
     angles = np.linspace(0, 2*np.pi, len(types), endpoint=False).tolist()
     angles += angles[:1]
     
-    fig, ax = plt.subplots(figsize=(8, 8), subplot_kw=dict(polar=True))
+    fig = Figure(figsize=(8, 8), dpi=dpi)
+    ax = fig.add_subplot(polar=True)
     fig.patch.set_facecolor('#0F0F1A' if dark_mode else '#FFFFFF')
     ax.set_facecolor('#0F0F1A' if dark_mode else '#FFFFFF')
     
@@ -163,19 +175,17 @@ def create_riasec_chart(scores, dark_mode=False):
     ax.set_thetagrids(np.degrees(angles[:-1]), labels)
     
     ax.set_rlabel_position(0)
-    plt.yticks([1, 2, 3, 4, 5], ["1", "2", "3", "4", "5"], color="#B0E0E6" if dark_mode else "#1A1A2E", size=10)
-    plt.ylim(1, 5)
+    ax.set_yticks([1, 2, 3, 4, 5], ["1", "2", "3", "4", "5"], color="#B0E0E6" if dark_mode else "#1A1A2E", size=10)
+    ax.set_ylim(1, 5)
     
     for label in ax.get_xticklabels():
         label.set_color("#B0E0E6" if dark_mode else "#1A1A2E")
     
     ax.grid(color="#00CED1" if dark_mode else "#1A1A2E", alpha=0.3, linestyle='--')
     
-    temp_file = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
-    plt.savefig(temp_file.name, bbox_inches='tight', facecolor=fig.get_facecolor())
-    plt.close()
-    
-    return temp_file.name
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', bbox_inches='tight', facecolor=fig.get_facecolor())
+    return buffer.getvalue()
 
 def set_page_style():
     st.markdown(f"""
@@ -357,13 +367,31 @@ def set_page_style():
     </style>
     """, unsafe_allow_html=True)
 
-def create_pdf(name, scores, dominant_type, recommended_jobs, chart_path):
+PDF_CACHE_SIZE = 64
+PDF_CHART_DPI = 60
+PDF_LOGO_WIDTH = 400
+
+@functools.lru_cache(maxsize=1)
+def prepared_logo_path():
+    # Logo diperkecil sekali per proses (2154px -> 400px) dan dipakai ulang oleh semua PDF
+    logo_path = os.path.join(BASE_DIR, "../Logo/FM_logo_full.png")
+    if not os.path.exists(logo_path):
+        return None
+    with Image.open(logo_path) as img:
+        img.thumbnail((PDF_LOGO_WIDTH, PDF_LOGO_WIDTH))
+        fd, prepared_path = tempfile.mkstemp(prefix="fm_logo_", suffix=".png")
+        with os.fdopen(fd, 'wb') as f:
+            img.save(f, format='PNG')
+    atexit.register(os.unlink, prepared_path)
+    return prepared_path
+
+def create_pdf(name, scores, dominant_type, recommended_jobs, chart_png):
     pdf = FPDF()
     pdf.add_page()
     pdf.set_auto_page_break(auto=True, margin=15)
     
-    logo_path = os.path.join(BASE_DIR, "../Logo/FM_logo_full.png")
-    if os.path.exists(logo_path):
+    logo_path = prepared_logo_path()
+    if logo_path:
         pdf.image(logo_path, x=10, y=8, w=40)
     
     pdf.set_font("Arial", 'B', 16)
@@ -388,14 +416,17 @@ def create_pdf(name, scores, dominant_type, recommended_jobs, chart_path):
     pdf.set_font("Arial", 'B', 14)
     pdf.cell(0, 10, "Profil Kepribadian:", 0, 1)
     pdf.ln(5)
-    img = Image.open(chart_path)
-    width, height = img.size
+    with Image.open(io.BytesIO(chart_png)) as img:
+        width, height = img.size
     aspect_ratio = width / height
     new_height = 120
     new_width = int(aspect_ratio * new_height)
-    pdf.image(chart_path, x=(210 - new_width) // 2, w=new_width, h=new_height)
+    # FPDF 1.7 hanya menerima path file; file sementara selalu dihapus saat keluar blok
+    with tempfile.NamedTemporaryFile(suffix='.png') as chart_file:
+        chart_file.write(chart_png)
+        chart_file.flush()
+        pdf.image(chart_file.name, x=(210 - new_width) // 2, w=new_width, h=new_height)
     pdf.ln(10)
-    img.close()
     
     pdf.set_font("Arial", 'B', 14)
     pdf.cell(0, 10, f"Tipe Dominan: {riasec_types[dominant_type]['name']}", 0, 1)
@@ -413,21 +444,32 @@ def create_pdf(name, scores, dominant_type, recommended_jobs, chart_path):
     for job in recommended_jobs:
         pdf.cell(0, 10, f"- {job}", 0, 1)
     
-    os.unlink(chart_path)
-    
     return pdf.output(dest='S').encode('latin1')
 
-def get_pdf_download_link(pdf_output, name):
-    b64 = base64.b64encode(pdf_output).decode()
+def answers_digest(answers):
+    return hashlib.sha256(json.dumps(sorted(answers.items())).encode()).hexdigest()
+
+@functools.lru_cache(maxsize=PDF_CACHE_SIZE)
+def _cached_pdf(name, answers_key, score_items, dominant_type, job_titles, dark_mode):
+    # Chart untuk PDF dirender pada dpi rendah (~480px) agar ukuran file kecil
+    scores = dict(score_items)
+    chart_png = create_riasec_chart(scores, dark_mode, dpi=PDF_CHART_DPI)
+    return create_pdf(name, scores, dominant_type, list(job_titles), chart_png)
+
+def get_pdf_report(name, answers, scores, dominant_type, job_titles, dark_mode=True):
+    # PDF hanya dibuat saat diminta, lalu di-cache per (nama, hash jawaban)
+    return _cached_pdf(name, answers_digest(answers), tuple(scores.items()), dominant_type, tuple(job_titles), bool(dark_mode))
+
+def pdf_filename(name):
     current_date = datetime.now().strftime("%Y%m%d")
-    filename = f"hasil_tes_riasec_{name}_{current_date}.pdf"
-    return f'<a class="download-link" style="text-decoration: none !important;" href="data:application/octet-stream;base64,{b64}" download="{filename}">Download Hasil Tes (PDF)</a>'
+    return f"hasil_tes_riasec_{name}_{current_date}.pdf"
 
 def render_home_button():
     if st.session_state.page != "start":
         if st.button("🏠 Home", key="home_button"):
             st.session_state.page = "start"
             st.session_state.answers = {}
+            st.session_state.pop('results', None)
             st.rerun()
 
 def main():
@@ -435,6 +477,7 @@ def main():
     
     if 'page' not in st.session_state:
         st.session_state.page = "start"
+        metrics.inc('fm_sessions_total')
     if 'answers' not in st.session_state:
         st.session_state.answers = {}
     if 'name' not in st.session_state:
@@ -452,17 +495,18 @@ def main():
         render_test_page()
     
     elif st.session_state.page == "results":
-        if 'model' not in st.session_state:
-            try:
-                with st.spinner('Memproses hasil tes...'):
-                    st.session_state.model = load_model(os.path.join(BASE_DIR, "../model/embedding_model.h5"), compile=False)
-                    st.session_state.scaler = joblib.load(os.path.join(BASE_DIR, "../model/scaler.pkl"))
-                    st.session_state.df_pivot = pd.read_csv(os.path.join(BASE_DIR, "../dataset/job_with_family.csv"))
-            except Exception as e:
-                st.error(f"Failed to load resources: {str(e)}")
-                st.stop()
+        try:
+            # Model, scaler, dan katalog dimuat sekali per proses dan dibagikan ke semua sesi
+            with st.spinner('Memproses hasil tes...'), metrics.span('load_resources'):
+                resources.get_job_index()
+        except Exception as e:
+            st.error(f"Failed to load resources: {str(e)}")
+            st.stop()
         
-        render_results_page()
+        with metrics.span('render_results'):
+            render_results_page()
+
+    metrics.maybe_flush()
 
 def render_start_page():
     col1, col2, col3 = st.columns([1,2,1])
@@ -549,22 +593,42 @@ def render_test_page():
         st.session_state.page = "results"
         st.rerun()
 
+def compute_results(answers, dark_mode):
+    user_scores = score_answers(answers).tolist()
+    scores = scores_dict(user_scores)
+    cursor = RecommendationCursor(score_jobs(user_scores), page_size=5)
+    cursor.next_page()
+    with metrics.span('chart'):
+        chart_png = create_riasec_chart(scores, dark_mode)
+    return {
+        'scores': scores,
+        'user_scores': user_scores,
+        'dominant_type': max(scores.items(), key=lambda x: x[1])[0],
+        'chart_png': chart_png,
+        'cursor': cursor,
+    }
+
+def get_results():
+    # Skor, chart, dan rekomendasi dihitung sekali per set jawaban; rerun berikutnya
+    # (toggle, scroll, klik widget) memakai hasil yang tersimpan di sesi
+    dark_mode = st.session_state.get('dark_mode', True)
+    key = (answers_digest(st.session_state.answers), dark_mode)
+    results = st.session_state.get('results')
+    if results is None or results['key'] != key:
+        with metrics.span('compute_results'):
+            results = compute_results(st.session_state.answers, dark_mode)
+        results['key'] = key
+        st.session_state.results = results
+    else:
+        metrics.inc('fm_results_cache_hits_total')
+    return results
+
 def render_results_page():
     st.markdown(f"<h1 style='color: var(--primary); text-shadow: 0 0 10px var(--primary);'>Hasil Tes Kepribadian RIASEC</h1>", unsafe_allow_html=True)
     st.markdown(f"<h3 style='color: var(--text); text-shadow: 0 0 5px var(--text-secondary);'>Untuk {st.session_state.name}</h3>", unsafe_allow_html=True)
     
-    scores = {"R": 0, "I": 0, "A": 0, "S": 0, "E": 0, "C": 0}
-    
-    for idx, answer in st.session_state.answers.items():
-        q_type = questions[idx]["type"]
-        scores[q_type] += answer
-    
-    for k in scores:
-        question_count = len([q for q in questions if q["type"] == k])
-        if question_count > 0:
-            scores[k] = round(scores[k] / question_count, 2)
-    
-    user_scores = [scores['R'], scores['I'], scores['A'], scores['S'], scores['E'], scores['C']]
+    results = get_results()
+    scores = results['scores']
     
     st.markdown("<h3 style='color: var(--text); text-shadow: 0 0 5px var(--text-secondary);'>Skor Anda:</h3>", unsafe_allow_html=True)
     
@@ -585,12 +649,11 @@ def render_results_page():
             """, unsafe_allow_html=True)
     
     st.markdown("<h3 style='color: var(--text); text-shadow: 0 0 5px var(--text-secondary);'>Profil Kepribadian:</h3>", unsafe_allow_html=True)
-    chart_path = create_riasec_chart(scores, st.session_state)
     col1, col2, col3 = st.columns([1,2,1])
     with col2:
-        st.image(chart_path)
+        st.image(results['chart_png'])
     
-    dominant_type = max(scores.items(), key=lambda x: x[1])[0]
+    dominant_type = results['dominant_type']
     st.markdown(f"""
     <div class="result-card">
         <h3 style='color: var(--text); text-shadow: 0 0 5px var(--text-secondary);'>Tipe Dominan: {riasec_types[dominant_type]['name']}</h3>
@@ -598,7 +661,14 @@ def render_results_page():
     </div>
     """, unsafe_allow_html=True)
     
-    recommended_jobs_df = recommend_jobs(user_scores)
+    # "Load more" hanya mengambil halaman berikutnya dari cursor; tabel dibangun ulang bila jumlahnya berubah
+    cursor = results['cursor']
+    if results.get('jobs_offset') != cursor.offset:
+        with metrics.span('jobs_frame'):
+            results['jobs_df'] = jobs_frame(results['user_scores'], cursor.scores, cursor.shown())
+        metrics.inc('fm_recommendations_served_total', cursor.offset - (results.get('jobs_offset') or 0))
+        results['jobs_offset'] = cursor.offset
+    recommended_jobs_df = results['jobs_df']
     
     st.markdown("<h3 style='color: var(--text); text-shadow: 0 0 5px var(--text-secondary);'>Rekomendasi Karier untuk Anda:</h3>", unsafe_allow_html=True)
 
@@ -632,15 +702,37 @@ def render_results_page():
         recommended_jobs_df.to_html(classes="job-table", index=False, escape=False),
         unsafe_allow_html=True
     )
+
+    render_skill_panel(cursor.shown())
+    render_related_panel(cursor.shown())
+
+    if cursor.has_more and st.button("Tampilkan lebih banyak", key="load_more_jobs"):
+        cursor.next_page()
+        st.rerun()
     
-    pdf_output = create_pdf(
-        st.session_state.name, 
-        scores, 
-        dominant_type, 
-        recommended_jobs_df['Title'].tolist(),
-        chart_path
-    )
-    st.markdown(get_pdf_download_link(pdf_output, st.session_state.name), unsafe_allow_html=True)
+    job_titles = recommended_jobs_df['Title'].tolist()
+    pdf_key = (st.session_state.name, results['key'][0], tuple(job_titles))
+    if st.session_state.get('pdf_requested') == pdf_key:
+        with metrics.span('pdf'):
+            pdf_bytes = get_pdf_report(
+                st.session_state.name,
+                st.session_state.answers,
+                scores,
+                dominant_type,
+                job_titles,
+                st.session_state.get('dark_mode', True)
+            )
+        st.download_button(
+            "Download Hasil Tes (PDF)",
+            data=pdf_bytes,
+            file_name=pdf_filename(st.session_state.name),
+            mime="application/pdf",
+            key="download_pdf"
+        )
+    elif st.button("Siapkan PDF Hasil Tes", key="prepare_pdf"):
+        st.session_state.pdf_requested = pdf_key
+        metrics.inc('fm_pdf_reports_total')
+        st.rerun()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
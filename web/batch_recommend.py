@@ -0,0 +1,150 @@
+import os
+import time
+import argparse
+import numpy as np
+import pandas as pd
+import resources
+from job_index import l2_normalize
+from topk import top_k_rows
+from questionnaire import questions, riasec_types_list, score_answers
+
+# Rekomendasi batch untuk ribuan responden (misalnya spreadsheet dari sekolah).
+# Input CSV/JSONL dibaca per chunk; tiap chunk diskor dengan satu forward pass
+# dan satu perkalian matriks terhadap index pekerjaan, lalu langsung ditulis
+# ke output sehingga memori tetap terbatas.
+
+N_ITEMS = len(questions)
+
+
+def recommend_batch(answers, model, scaler, index, top_n=5):
+    # Skor RIASEC -> standardisasi -> embedding -> cosine terhadap seluruh katalog
+    scores = score_answers(answers)
+    scaled = (scores - scaler.mean_) / scaler.scale_
+    user_embed = l2_normalize(model.predict(scaled.astype(np.float32), verbose=0))
+    top_idx, top_sim = top_k_rows(index.score_matrix(user_embed), top_n)
+    return scores, top_idx, top_sim
+
+
+def item_columns(chunk, id_column):
+    # Kolom jawaban: q1..q42 (atau q0..q41, huruf besar/kecil bebas); bila tidak ada,
+    # tepat 42 kolom numerik selain kolom id. Kolom lain (nama, kelas, ...) diabaikan.
+    lookup = {str(c).lower(): c for c in chunk.columns}
+    for first in (1, 0):
+        names = [f"q{i + first}" for i in range(N_ITEMS)]
+        if all(n in lookup for n in names):
+            return [lookup[n] for n in names]
+    numeric = [c for c in chunk.columns if c != id_column and pd.api.types.is_numeric_dtype(chunk[c])]
+    if len(numeric) == N_ITEMS:
+        return numeric
+    others = [c for c in chunk.columns if c != id_column and c not in numeric]
+    raise ValueError(
+        f"Input harus memiliki kolom q1..q{N_ITEMS} atau tepat {N_ITEMS} kolom jawaban numerik; "
+        f"ditemukan {len(numeric)} kolom numerik {numeric} dan kolom non-numerik {others}"
+    )
+
+
+def _answer_matrix(chunk, id_column, columns=None):
+    if 'answers' in chunk.columns:
+        answers = np.array([np.asarray(a, dtype=np.float32) if isinstance(a, (list, tuple)) and len(a) == N_ITEMS
+                            else np.full(N_ITEMS, np.nan, dtype=np.float32) for a in chunk['answers']])
+    else:
+        columns = columns or item_columns(chunk, id_column)
+        answers = chunk[columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float32)
+    if id_column in chunk.columns:
+        ids = chunk[id_column].astype(str).to_numpy()
+    else:
+        ids = chunk.index.astype(str).to_numpy()
+    return ids, answers
+
+
+def iter_answer_chunks(path, chunksize=10000, id_column='id'):
+    if path.endswith(('.jsonl', '.json')):
+        reader = pd.read_json(path, lines=True, chunksize=chunksize)
+    else:
+        reader = pd.read_csv(path, chunksize=chunksize)
+    columns = None
+    for chunk in reader:
+        # Kolom jawaban ditentukan dari chunk pertama dan dipakai untuk seluruh file
+        if columns is None and 'answers' not in chunk.columns:
+            columns = item_columns(chunk, id_column)
+        yield _answer_matrix(chunk, id_column, columns)
+
+
+class _Writer:
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith('.parquet')
+        self._writer = None
+        self._first = True
+
+    def write(self, frame):
+        if self.parquet:
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise SystemExit("Output Parquet membutuhkan pyarrow (pip install pyarrow)")
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode='w' if self._first else 'a', header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def run_batch(input_path, output_path, top_n=5, chunksize=10000, id_column='id'):
+    model = resources.get_model()
+    scaler = resources.get_scaler()
+    index = resources.get_job_index()
+
+    writer = _Writer(output_path)
+    n_rows, n_skipped = 0, 0
+    try:
+        for ids, answers in iter_answer_chunks(input_path, chunksize, id_column):
+            # Baris dengan jawaban kosong atau di luar skala 1-5 dilewati
+            valid = np.all((answers >= 1) & (answers <= 5), axis=1)
+            n_skipped += int((~valid).sum())
+            ids, answers = ids[valid], answers[valid]
+            if len(ids) == 0:
+                continue
+            scores, top_idx, top_sim = recommend_batch(answers, model, scaler, index, top_n)
+            n, k = top_idx.shape
+            flat_idx = top_idx.ravel()
+            frame = pd.DataFrame({
+                'respondent_id': np.repeat(ids, k),
+                'rank': np.tile(np.arange(1, k + 1), n),
+                'O*NET-SOC Code': index.codes[flat_idx],
+                'Title': index.titles[flat_idx],
+                'Job Family': index.job_families[flat_idx],
+                'Similarity Score': np.round(top_sim.ravel(), 3),
+            })
+            for j, name in enumerate(riasec_types_list):
+                frame[name] = np.repeat(scores[:, j], k)
+            writer.write(frame)
+            n_rows += n
+    finally:
+        writer.close()
+    return n_rows, n_skipped
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rekomendasi karier batch dari file jawaban kuesioner 42 butir")
+    parser.add_argument("input", help="File CSV/JSONL: kolom q1..q42 (atau tepat 42 kolom jawaban numerik), atau field 'answers' berisi list 42 angka")
+    parser.add_argument("output", help="File output .csv atau .parquet")
+    parser.add_argument("--top-n", type=int, default=5)
+    parser.add_argument("--chunksize", type=int, default=10000)
+    parser.add_argument("--id-column", default="id")
+    args = parser.parse_args()
+
+    if os.path.exists(args.output):
+        os.unlink(args.output)
+    start = time.perf_counter()
+    n_rows, n_skipped = run_batch(args.input, args.output, args.top_n, args.chunksize, args.id_column)
+    elapsed = time.perf_counter() - start
+    print(f"{n_rows} responden diproses dalam {elapsed:.2f} detik ({n_skipped} baris tidak valid dilewati)")
+    print(f"Hasil disimpan ke {args.output}")
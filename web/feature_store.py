@@ -0,0 +1,221 @@
+import os
+import time
+import argparse
+import numpy as np
+from job_index import file_digest
+from onet_cache import CACHE_DIR, RAW_DIR, table_path
+
+# Feature store deskriptor O*NET (Skills, Knowledge, Abilities) per pekerjaan.
+# Tabel sumber berformat panjang (kode x elemen x skala); tabel dibaca sekali secara
+# streaming per batch (Parquet dari onet_cache, fallback xlsx read-only) dan langsung
+# dipetakan ke matriks float32 pekerjaan x elemen untuk tiap skala (IM = importance,
+# LV = level), tanpa pivot_table. Nilai yang hilang/di-suppress O*NET disimpan sebagai NaN.
+# Satu file .npz per keluarga deskriptor, dibangun offline (CLI) dan dibangun ulang hanya bila
+# isi sumbernya berubah; aplikasi hanya memuat file yang sudah ada.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_DIR = os.path.join(BASE_DIR, "../Dataset/feature_store")
+FAMILIES = {'skills': 'Skills', 'knowledge': 'Knowledge', 'abilities': 'Abilities'}
+SCALES = ('IM', 'LV')
+STORE_FORMAT = 1
+BATCH_ROWS = 8192
+COLUMNS = ['O*NET-SOC Code', 'Element ID', 'Element Name', 'Scale ID', 'Data Value', 'Recommend Suppress']
+
+
+class FeatureMatrix:
+    def __init__(self, family, codes, element_ids, element_names, matrices, source_digest=''):
+        self.family = family
+        self.codes = codes
+        self.element_ids = element_ids
+        self.element_names = element_names
+        self.matrices = matrices  # {skala: (n_pekerjaan, n_elemen) float32}
+        self.source_digest = source_digest
+        self._rows = {code: i for i, code in enumerate(codes)}
+
+    @property
+    def shape(self):
+        return len(self.codes), len(self.element_ids)
+
+    def row(self, code, scale='IM'):
+        i = self._rows.get(code)
+        return None if i is None else self.matrices[scale][i]
+
+    def top_elements(self, code, n=5):
+        # Elemen terpenting untuk satu pekerjaan: urut importance, lalu level
+        importance = self.row(code, 'IM')
+        if importance is None:
+            return []
+        level = self.row(code, 'LV')
+        level = level if level is not None else np.full_like(importance, np.nan)
+        valid = np.flatnonzero(~np.isnan(importance))
+        order = valid[np.lexsort((-np.nan_to_num(level[valid]), -importance[valid]))][:n]
+        return [(self.element_names[j], float(importance[j]), float(level[j])) for j in order]
+
+
+# ========================
+# Ingest streaming
+# ========================
+def _intern(values, table):
+    # Petakan nilai ke id bertahap (urutan kemunculan pertama) tanpa loop per baris
+    uniq, inverse = np.unique(np.asarray(values, dtype=object).astype(str), return_inverse=True)
+    ids = np.array([table.setdefault(u, len(table)) for u in uniq], dtype=np.int32)
+    return ids[inverse]
+
+
+def _parquet_batches(path):
+    import pyarrow.parquet as pq
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=BATCH_ROWS, columns=COLUMNS):
+        yield {name: batch.column(name).to_numpy(zero_copy_only=False) for name in COLUMNS}
+
+
+def _xlsx_batches(path):
+    from openpyxl import load_workbook
+    workbook = load_workbook(path, read_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = list(next(rows))
+        positions = [header.index(name) for name in COLUMNS]
+        chunk = []
+        for row in rows:
+            chunk.append([row[p] for p in positions])
+            if len(chunk) == BATCH_ROWS:
+                yield dict(zip(COLUMNS, map(np.array, zip(*chunk))))
+                chunk = []
+        if chunk:
+            yield dict(zip(COLUMNS, map(np.array, zip(*chunk))))
+    finally:
+        workbook.close()
+
+
+def source_path(table, cache_dir=CACHE_DIR, raw_dir=RAW_DIR):
+    # Cache Parquet bila ada, selain itu workbook mentah; None bila tabel tidak tersedia
+    for path in (table_path(table, cache_dir), os.path.join(raw_dir, f"{table}.xlsx")):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def build_feature_matrix(family, path):
+    batches = _parquet_batches(path) if path.endswith('.parquet') else _xlsx_batches(path)
+    codes, elements, names = {}, {}, {}
+    rows, cols, scale_ids, values = [], [], [], []
+    for batch in batches:
+        scale = batch['Scale ID'].astype(str)
+        keep = np.isin(scale, SCALES)
+        # Estimasi yang disarankan O*NET untuk di-suppress dianggap tidak ada
+        keep &= batch['Recommend Suppress'].astype(str) != 'Y'
+        if not keep.any():
+            continue
+        element_ids = batch['Element ID'][keep]
+        rows.append(_intern(batch['O*NET-SOC Code'][keep], codes))
+        cols.append(_intern(element_ids, elements))
+        for element_id, name in zip(element_ids, batch['Element Name'][keep]):
+            names.setdefault(str(element_id), str(name))
+        scale_ids.append((scale[keep] == 'LV').astype(np.int8))
+        values.append(batch['Data Value'][keep].astype(np.float32))
+
+    rows, cols = np.concatenate(rows), np.concatenate(cols)
+    scale_ids, values = np.concatenate(scale_ids), np.concatenate(values)
+    matrices = {}
+    for s, scale in enumerate(SCALES):
+        matrix = np.full((len(codes), len(elements)), np.nan, dtype=np.float32)
+        mask = scale_ids == s
+        matrix[rows[mask], cols[mask]] = values[mask]
+        matrices[scale] = matrix
+    element_ids = np.array(list(elements), dtype=str)
+    return FeatureMatrix(family, np.array(list(codes), dtype=str), element_ids,
+                         np.array([names[e] for e in element_ids], dtype=str), matrices, file_digest(path))
+
+
+# ========================
+# Penyimpanan
+# ========================
+def store_path(family, store_dir=STORE_DIR):
+    return os.path.join(store_dir, f"{family}.npz")
+
+
+def save_feature_matrix(matrix, path):
+    arrays = {
+        'format': np.array(STORE_FORMAT),
+        'family': np.array(matrix.family),
+        'codes': matrix.codes,
+        'element_ids': matrix.element_ids,
+        'element_names': matrix.element_names,
+        'source_digest': np.array(matrix.source_digest),
+    }
+    arrays.update({f'scale_{scale}': m for scale, m in matrix.matrices.items()})
+    tmp_path = f"{path}.tmp.npz"
+    np.savez_compressed(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+
+def load_feature_matrix(path):
+    with np.load(path, allow_pickle=False) as data:
+        if int(data['format']) != STORE_FORMAT:
+            raise ValueError(f"Format {path} tidak dikenali")
+        matrices = {scale: data[f'scale_{scale}'] for scale in SCALES}
+        return FeatureMatrix(str(data['family']), data['codes'], data['element_ids'],
+                             data['element_names'], matrices, str(data['source_digest']))
+
+
+def load_feature_store(store_dir=STORE_DIR, families=FAMILIES):
+    # Untuk serving: hanya memuat file store yang sudah dibangun offline (CLI di bawah).
+    # {keluarga: FeatureMatrix}; keluarga yang belum dibangun atau gagal dibaca dilewati
+    store = {}
+    for family in families:
+        try:
+            store[family] = load_feature_matrix(store_path(family, store_dir))
+        except (OSError, KeyError, ValueError):
+            continue
+    return store
+
+
+def build_feature_store(store_dir=STORE_DIR, families=FAMILIES, cache_dir=CACHE_DIR, raw_dir=RAW_DIR, force=False):
+    # Bangun/perbarui store; keluarga dibangun ulang hanya bila isi tabel sumbernya berubah.
+    # Mengembalikan {keluarga: (FeatureMatrix, detik build atau None bila dipakai ulang)}
+    built = {}
+    for family, table in families.items():
+        path = store_path(family, store_dir)
+        source = source_path(table, cache_dir, raw_dir)
+        if source is None:
+            continue
+        if not force and os.path.exists(path):
+            try:
+                matrix = load_feature_matrix(path)
+            except (OSError, KeyError, ValueError):
+                matrix = None
+            if matrix is not None and matrix.source_digest == file_digest(source):
+                built[family] = (matrix, None)
+                continue
+        start = time.perf_counter()
+        matrix = build_feature_matrix(family, source)
+        seconds = time.perf_counter() - start
+        os.makedirs(store_dir, exist_ok=True)
+        save_feature_matrix(matrix, path)
+        built[family] = (matrix, seconds)
+    return built
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bangun feature store Skills/Knowledge/Abilities O*NET")
+    parser.add_argument("--store-dir", default=STORE_DIR)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--force", action="store_true", help="Bangun ulang walau tabel sumber tidak berubah")
+    parser.add_argument("--code", default=None, help="Tampilkan elemen teratas untuk satu kode O*NET-SOC")
+    args = parser.parse_args()
+
+    built = build_feature_store(args.store_dir, FAMILIES, args.cache_dir, args.raw_dir, args.force)
+    for family, table in FAMILIES.items():
+        if family not in built:
+            print(f"{family:<10} dilewati (tabel {table} tidak ditemukan)")
+            continue
+        matrix, seconds = built[family]
+        path = store_path(family, args.store_dir)
+        filled = float(np.mean(~np.isnan(matrix.matrices['IM'])))
+        status = f"{seconds:.2f} detik" if seconds is not None else "tidak berubah"
+        print(f"{family:<10} {matrix.shape[0]} pekerjaan x {matrix.shape[1]} elemen, terisi {filled:.0%}, "
+              f"{status}, {os.path.getsize(path) / 1e3:.0f} KB -> {path}")
+        if args.code:
+            for name, importance, level in matrix.top_elements(args.code):
+                print(f"    {name:<40} IM={importance:.2f} LV={level:.2f}")
@@ -0,0 +1,288 @@
+import os
+import json
+import shutil
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+
+# Index embedding pekerjaan yang dihitung sekali per versi model.
+# Artefak berisi matriks float32 yang sudah dinormalisasi L2 beserta metadata
+# katalog, sehingga saat serving cukup meng-embed user lalu satu dot product.
+
+riasec_types_list = ['Realistic', 'Investigative', 'Artistic', 'Social', 'Enterprising', 'Conventional']
+INDEX_FORMAT = 1
+MMAP_FORMAT = 1
+INDEX_DTYPES = ('float32', 'float16', 'int8')
+MMAP_ARRAYS = ('embeddings', 'codes', 'titles', 'job_families')
+# Baris index yang didekuantisasi sekaligus saat scoring index float16/int8
+SCORE_BLOCK_ROWS = 4096
+
+
+def file_digest(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def model_version(model_path, scaler_path, catalog_path):
+    # Versi index ditentukan oleh isi file model, scaler, dan katalog
+    h = hashlib.sha256()
+    h.update(f"format={INDEX_FORMAT}".encode())
+    for path in (model_path, scaler_path, catalog_path):
+        h.update(file_digest(path).encode())
+    return h.hexdigest()[:16]
+
+
+def l2_normalize(x):
+    x = np.asarray(x, dtype=np.float32)
+    norm = np.linalg.norm(x, axis=1, keepdims=True)
+    return x / np.maximum(norm, 1e-12)
+
+
+class JobIndex:
+    def __init__(self, embeddings, codes, titles, job_families, version, scales=None):
+        # embeddings float32/float16, atau int8 dengan skala per baris (scales) untuk dekuantisasi
+        self.embeddings = embeddings
+        self.codes = codes
+        self.titles = titles
+        self.job_families = job_families
+        self.version = version
+        self.scales = scales
+
+    def __len__(self):
+        return len(self.embeddings)
+
+    @property
+    def dtype(self):
+        return self.embeddings.dtype.name
+
+    def score_matrix(self, user_embed):
+        # Cosine similarity (n_user, n_job): baris index sudah ternormalisasi, jadi cukup normalisasi user
+        user = l2_normalize(np.atleast_2d(user_embed))
+        if self.embeddings.dtype == np.float32:
+            sim = user @ self.embeddings.T
+        else:
+            # float16/int8: dekuantisasi per blok baris, sehingga tiap request hanya membuat salinan
+            # float32 sebesar satu blok, bukan seluruh matriks yang dibagi lewat mmap
+            sim = np.empty((len(user), len(self)), dtype=np.float32)
+            for start in range(0, len(self), SCORE_BLOCK_ROWS):
+                block = self.embeddings[start:start + SCORE_BLOCK_ROWS]
+                sim[:, start:start + len(block)] = user @ block.astype(np.float32).T
+        if self.scales is not None:
+            sim *= self.scales
+        return sim
+
+    def similarities(self, user_embed):
+        sim = self.score_matrix(user_embed)
+        return sim[0] if sim.shape[0] == 1 else sim
+
+    def dense_embeddings(self):
+        # Salinan float32 (dekuantisasi); hanya untuk build artefak turunan, bukan jalur serving
+        dense = np.asarray(self.embeddings, dtype=np.float32)
+        return dense * self.scales[:, None] if self.scales is not None else dense
+
+    def matches_catalog(self, df_pivot):
+        return len(self) == len(df_pivot) and \
+            np.array_equal(self.codes, df_pivot['O*NET-SOC Code'].to_numpy(dtype=str))
+
+
+def embed_catalog(model, scaler, df_pivot):
+    features = scaler.transform(df_pivot[riasec_types_list])
+    return l2_normalize(model.predict(features, verbose=0))
+
+
+def build_job_index(model, scaler, df_pivot, version):
+    return JobIndex(
+        embeddings=embed_catalog(model, scaler, df_pivot),
+        codes=df_pivot['O*NET-SOC Code'].to_numpy(dtype=str),
+        titles=df_pivot['Title'].to_numpy(dtype=str),
+        job_families=df_pivot['Job Family'].fillna('').to_numpy(dtype=str),
+        version=version,
+    )
+
+
+def save_job_index(index, path):
+    # Tulis ke file sementara lalu os.replace agar pembaca tidak melihat file setengah jadi
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(
+        tmp_path,
+        embeddings=index.embeddings,
+        codes=index.codes,
+        titles=index.titles,
+        job_families=index.job_families,
+        version=np.array(index.version),
+        format=np.array(INDEX_FORMAT),
+    )
+    os.replace(tmp_path, path)
+
+
+def load_job_index(path, expected_version=None):
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['format']) != INDEX_FORMAT:
+                return None
+            version = str(data['version'])
+            if expected_version is not None and version != expected_version:
+                return None
+            return JobIndex(
+                embeddings=np.ascontiguousarray(data['embeddings'], dtype=np.float32),
+                codes=data['codes'],
+                titles=data['titles'],
+                job_families=data['job_families'],
+                version=version,
+            )
+    except (KeyError, ValueError):
+        # Artefak lama/rusak dianggap basi dan akan dibangun ulang
+        return None
+
+
+def quantize(embeddings, dtype):
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if dtype == 'float32':
+        return embeddings, None
+    if dtype == 'float16':
+        return embeddings.astype(np.float16), None
+    if dtype == 'int8':
+        # Kuantisasi simetris per baris: x ~= q * scale, q di [-127, 127]
+        scales = np.maximum(np.abs(embeddings).max(axis=1), 1e-12) / 127.0
+        q = np.clip(np.rint(embeddings / scales[:, None]), -127, 127).astype(np.int8)
+        return q, scales.astype(np.float32)
+    raise ValueError(f"dtype index '{dtype}' tidak didukung, pilih salah satu dari {INDEX_DTYPES}")
+
+
+def mmap_index_path(base_dir, version, dtype):
+    # Satu direktori per (versi, dtype) sehingga publikasi cukup satu rename atomik
+    return os.path.join(base_dir, f"{version}-{dtype}")
+
+
+def save_mmap_index(index, base_dir, dtype='float32'):
+    embeddings, scales = quantize(index.dense_embeddings(), dtype)
+    arrays = {
+        'embeddings': embeddings,
+        'codes': np.asarray(index.codes, dtype=str),
+        'titles': np.asarray(index.titles, dtype=str),
+        'job_families': np.asarray(index.job_families, dtype=str),
+    }
+    if scales is not None:
+        arrays['scales'] = scales
+    path = mmap_index_path(base_dir, index.version, dtype)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    os.makedirs(tmp_path, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_path, f"{name}.npy"), np.ascontiguousarray(array))
+    with open(os.path.join(tmp_path, "meta.json"), 'w') as f:
+        json.dump({'format': MMAP_FORMAT, 'version': index.version, 'dtype': dtype, 'rows': len(embeddings)}, f)
+    try:
+        os.rename(tmp_path, path)
+    except OSError:
+        # Proses lain sudah mempublikasikan versi yang sama lebih dulu
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    return path
+
+
+def load_mmap_index(base_dir, version, dtype='float32'):
+    # Semua array di-map read-only; beberapa proses worker berbagi satu salinan di page cache OS
+    path = mmap_index_path(base_dir, version, dtype)
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta.get('format') != MMAP_FORMAT or meta.get('version') != version or meta.get('dtype') != dtype:
+            return None
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r', allow_pickle=False)
+                  for name in MMAP_ARRAYS}
+        scales_path = os.path.join(path, "scales.npy")
+        scales = np.load(scales_path, mmap_mode='r') if os.path.exists(scales_path) else None
+    except (OSError, ValueError):
+        return None
+    if len(arrays['embeddings']) != meta.get('rows'):
+        return None
+    return JobIndex(version=version, scales=scales, **arrays)
+
+
+def load_or_build_mmap_index(model, scaler, df_pivot, base_dir, version, dtype='float32'):
+    index = load_mmap_index(base_dir, version, dtype)
+    if index is None or not index.matches_catalog(df_pivot):
+        dense = build_job_index(model, scaler, df_pivot, version)
+        try:
+            os.makedirs(base_dir, exist_ok=True)
+            save_mmap_index(dense, base_dir, dtype)
+            index = load_mmap_index(base_dir, version, dtype)
+        except OSError:
+            index = None
+        if index is None:
+            # Direktori model read-only: kuantisasi di memori saja
+            embeddings, scales = quantize(dense.embeddings, dtype)
+            index = JobIndex(embeddings, dense.codes, dense.titles, dense.job_families, version, scales)
+    return index
+
+
+def topk_overlap_report(reference, candidate, k=10):
+    # Query = setiap baris katalog; bandingkan himpunan top-k index terkuantisasi vs float32
+    from topk import top_k_rows
+    queries = reference.dense_embeddings()
+    ref_scores = reference.score_matrix(queries)
+    ref_idx, ref_sim = top_k_rows(ref_scores, k)
+    cand_idx, _ = top_k_rows(candidate.score_matrix(queries), k)
+    overlap = np.array([len(np.intersect1d(a, b)) for a, b in zip(ref_idx, cand_idx)]) / k
+    # Overlap berbasis skor: anggota top-k kandidat dianggap benar bila skor float32-nya >= skor ke-k referensi
+    kth = ref_sim[:, -1:] - 1e-6
+    tie_aware = (np.take_along_axis(ref_scores, cand_idx, axis=1) >= kth).mean(axis=1)
+    return {
+        'dtype': candidate.dtype,
+        'k': k,
+        'mean_overlap': round(float(overlap.mean()), 4),
+        'min_overlap': round(float(overlap.min()), 4),
+        'tie_aware_overlap': round(float(tie_aware.mean()), 4),
+        'top1_agreement': round(float(np.mean(ref_idx[:, 0] == cand_idx[:, 0])), 4),
+        'embedding_bytes': int(candidate.embeddings.nbytes + (candidate.scales.nbytes if candidate.scales is not None else 0)),
+    }
+
+
+def load_or_build_job_index(model, scaler, df_pivot, path, version):
+    index = load_job_index(path, expected_version=version)
+    if index is None or not index.matches_catalog(df_pivot):
+        index = build_job_index(model, scaler, df_pivot, version)
+        try:
+            save_job_index(index, path)
+        except OSError:
+            # Direktori model read-only: tetap pakai index di memori
+            pass
+    return index
+
+
+if __name__ == "__main__":
+    import joblib
+    from tensorflow.keras.models import load_model
+
+    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Bangun index embedding pekerjaan")
+    parser.add_argument("--model", default=os.path.join(BASE_DIR, "../model/embedding_model.h5"))
+    parser.add_argument("--scaler", default=os.path.join(BASE_DIR, "../model/scaler.pkl"))
+    parser.add_argument("--catalog", default=os.path.join(BASE_DIR, "../dataset/job_with_family.csv"))
+    parser.add_argument("--out", default=os.path.join(BASE_DIR, "../model/job_index.npz"))
+    parser.add_argument("--mmap-dir", default=None, help="Tulis juga index memory-mapped ke direktori ini")
+    parser.add_argument("--dtype", nargs="+", default=["float32"], choices=INDEX_DTYPES)
+    parser.add_argument("--report-k", type=int, default=10, help="k untuk laporan overlap top-k vs float32")
+    args = parser.parse_args()
+
+    version = model_version(args.model, args.scaler, args.catalog)
+    index = build_job_index(
+        load_model(args.model, compile=False),
+        joblib.load(args.scaler),
+        pd.read_csv(args.catalog),
+        version,
+    )
+    save_job_index(index, args.out)
+    print(f"Index {len(index)} pekerjaan (versi {version}) disimpan ke {args.out}")
+
+    if args.mmap_dir:
+        os.makedirs(args.mmap_dir, exist_ok=True)
+        for dtype in args.dtype:
+            path = save_mmap_index(index, args.mmap_dir, dtype)
+            mapped = load_mmap_index(args.mmap_dir, version, dtype)
+            print(f"Index {dtype} (memory-mapped) di {path}: {topk_overlap_report(index, mapped, args.report_k)}")
@@ -0,0 +1,165 @@
+import os
+import time
+import atexit
+import threading
+
+# Instrumentasi ringan untuk jalur panas (load resource, predict, chart, PDF).
+# Aktif bila env FM_METRICS=1 atau FM_METRICS_FILE=<path .prom> diset; bila tidak,
+# span() mengembalikan context manager kosong yang sama dan inc()/observe() langsung return.
+# Ekspor dalam format teks Prometheus: ke file (textfile collector) atau endpoint service.
+
+METRICS_FILE = os.environ.get("FM_METRICS_FILE") or None
+ENABLED = bool(METRICS_FILE) or os.environ.get("FM_METRICS", "").lower() in ("1", "true", "yes")
+FLUSH_INTERVAL = float(os.environ.get("FM_METRICS_FLUSH_SECONDS", "10"))
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_help = {}
+_last_flush = [0.0]
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def describe(name, help_text):
+    _help[name] = help_text
+
+
+def inc(name, value=1, **labels):
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, seconds, **labels):
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = {'buckets': [0] * len(DEFAULT_BUCKETS), 'sum': 0.0, 'count': 0}
+        for i, bound in enumerate(DEFAULT_BUCKETS):
+            if seconds <= bound:
+                hist['buckets'][i] += 1
+                break
+        hist['sum'] += seconds
+        hist['count'] += 1
+
+
+class _Span:
+    __slots__ = ('stage', 'start')
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe('fm_stage_seconds', time.perf_counter() - self.start, stage=self.stage)
+        # Hanya Exception yang dihitung; kontrol alur Streamlit (st.rerun/st.stop) turunan BaseException
+        if exc_type is not None and issubclass(exc_type, Exception):
+            inc('fm_stage_errors_total', stage=self.stage)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(stage):
+    # with metrics.span('model_predict'): ...
+    return _Span(stage) if ENABLED else _NOOP
+
+
+def _format_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ''
+    body = ','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"')) for k, v in items)
+    return '{' + body + '}'
+
+
+def export_text():
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: {'buckets': list(h['buckets']), 'sum': h['sum'], 'count': h['count']}
+                      for key, h in _histograms.items()}
+    lines = []
+    for name in sorted({name for name, _ in counters}):
+        if name in _help:
+            lines.append(f"# HELP {name} {_help[name]}")
+        lines.append(f"# TYPE {name} counter")
+        for (n, labels), value in sorted(counters.items()):
+            if n == name:
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+    for name in sorted({name for name, _ in histograms}):
+        if name in _help:
+            lines.append(f"# HELP {name} {_help[name]}")
+        lines.append(f"# TYPE {name} histogram")
+        for (n, labels), hist in sorted(histograms.items()):
+            if n != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(DEFAULT_BUCKETS, hist['buckets']):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {hist['count']}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {hist['sum']:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {hist['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path=None):
+    path = path or METRICS_FILE
+    if not path:
+        return
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(export_text())
+    os.replace(tmp_path, path)
+
+
+def maybe_flush():
+    # Dipanggil di akhir tiap render; file ditulis paling sering sekali per FLUSH_INTERVAL
+    if not METRICS_FILE:
+        return
+    now = time.monotonic()
+    if now - _last_flush[0] >= FLUSH_INTERVAL:
+        _last_flush[0] = now
+        write_textfile()
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+describe('fm_stage_seconds', "Durasi tiap tahap jalur panas (detik)")
+describe('fm_stage_errors_total', "Jumlah tahap yang gagal dengan exception")
+describe('fm_resource_load_seconds', "Durasi memuat resource (model, scaler, katalog, index)")
+describe('fm_resource_cache_hits_total', "Akses resource yang dilayani dari cache proses")
+describe('fm_sessions_total', "Sesi Streamlit baru")
+describe('fm_recommendations_served_total', "Jumlah baris rekomendasi pekerjaan yang ditampilkan/dikirim")
+describe('fm_results_cache_hits_total', "Halaman hasil yang memakai hasil tersimpan di sesi")
+describe('fm_pdf_reports_total', "Laporan PDF yang disajikan")
+
+if METRICS_FILE:
+    atexit.register(write_textfile)
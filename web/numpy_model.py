@@ -0,0 +1,155 @@
+import os
+import argparse
+import numpy as np
+from job_index import file_digest
+
+# Forward pass model embedding dengan NumPy murni, tanpa import TensorFlow.
+# Bobot diekspor sekali dari model Keras ke .npz; BatchNormalization dilipat
+# ke layer Dense di dekatnya dan Dropout dibuang karena tidak aktif saat inferensi.
+
+NPZ_FORMAT = 1
+# Toleransi selisih Keras vs NumPy yang dipakai CLI ekspor dan pipeline
+PARITY_ATOL = 1e-4
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0.0),
+}
+
+
+class NumpyEmbeddingModel:
+    def __init__(self, layers, source_digest=None):
+        # layers: list (kernel, bias, activation)
+        self.layers = layers
+        self.source_digest = source_digest
+
+    @property
+    def output_dim(self):
+        return self.layers[-1][0].shape[1]
+
+    def get_weights(self):
+        return [w for kernel, bias, _ in self.layers for w in (kernel, bias)]
+
+    def predict(self, x, verbose=0, batch_size=None):
+        # Signature mengikuti keras Model.predict agar bisa dipakai sebagai pengganti langsung
+        h = np.asarray(x, dtype=np.float32)
+        for kernel, bias, activation in self.layers:
+            h = ACTIVATIONS[activation](h @ kernel + bias)
+        return h
+
+
+def _bn_affine(layer):
+    gamma, beta, moving_mean, moving_var = layer.get_weights()
+    scale = gamma / np.sqrt(moving_var + layer.epsilon)
+    return scale, beta - moving_mean * scale
+
+
+def fold_keras_layers(keras_model):
+    layers = []
+    pending = None  # affine BN (scale, shift) yang belum dilipat ke Dense berikutnya
+    for layer in keras_model.layers:
+        kind = layer.__class__.__name__
+        if kind in ('InputLayer', 'Dropout'):
+            continue
+        if kind == 'Dense':
+            kernel, bias = layer.get_weights()
+            activation = layer.get_config()['activation']
+            if activation not in ACTIVATIONS:
+                raise ValueError(f"Aktivasi '{activation}' belum didukung")
+            if pending is not None:
+                scale, shift = pending
+                bias = shift @ kernel + bias
+                kernel = scale[:, None] * kernel
+                pending = None
+            layers.append([kernel, bias, activation])
+        elif kind == 'BatchNormalization':
+            scale, shift = _bn_affine(layer)
+            if layers and layers[-1][2] == 'linear' and pending is None:
+                # Dense tanpa aktivasi tepat sebelum BN: lipat ke Dense sebelumnya
+                kernel, bias, activation = layers[-1]
+                layers[-1] = [kernel * scale, bias * scale + shift, activation]
+            elif pending is None:
+                # Ada aktivasi di antara Dense dan BN: lipat ke Dense berikutnya
+                pending = (scale, shift)
+            else:
+                prev_scale, prev_shift = pending
+                pending = (prev_scale * scale, prev_shift * scale + shift)
+        else:
+            raise ValueError(f"Layer '{kind}' belum didukung oleh NumpyEmbeddingModel")
+    if pending is not None:
+        raise ValueError("BatchNormalization di akhir model belum didukung")
+    return [
+        (np.asarray(k, dtype=np.float32), np.asarray(b, dtype=np.float32), a)
+        for k, b, a in layers
+    ]
+
+
+def export_npz(keras_model, path, source_digest=''):
+    layers = fold_keras_layers(keras_model)
+    arrays = {
+        'format': np.array(NPZ_FORMAT),
+        'n_layers': np.array(len(layers)),
+        'source_digest': np.array(source_digest),
+    }
+    for i, (kernel, bias, activation) in enumerate(layers):
+        arrays[f'kernel_{i}'] = kernel
+        arrays[f'bias_{i}'] = bias
+        arrays[f'activation_{i}'] = np.array(activation)
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+    return NumpyEmbeddingModel(layers, source_digest)
+
+
+def load_npz(path):
+    with np.load(path, allow_pickle=False) as data:
+        if int(data['format']) != NPZ_FORMAT:
+            raise ValueError(f"Format {path} tidak dikenali")
+        layers = [
+            (data[f'kernel_{i}'], data[f'bias_{i}'], str(data[f'activation_{i}']))
+            for i in range(int(data['n_layers']))
+        ]
+        return NumpyEmbeddingModel(layers, str(data['source_digest']))
+
+
+def check_parity(keras_model, numpy_model, n_samples=2048, seed=0):
+    # Bandingkan output pada input acak di sekitar data terstandardisasi
+    rng = np.random.default_rng(seed)
+    x = rng.normal(0.0, 1.5, size=(n_samples, keras_model.input_shape[-1])).astype(np.float32)
+    expected = keras_model.predict(x, verbose=0)
+    return float(np.max(np.abs(expected - numpy_model.predict(x))))
+
+
+def default_npz_path(h5_path):
+    return os.path.splitext(h5_path)[0] + ".npz"
+
+
+def load_embedding_model(h5_path, npz_path=None):
+    # Pakai .npz bila ada dan berasal dari file .h5 yang sama; selain itu fallback ke Keras
+    npz_path = npz_path or default_npz_path(h5_path)
+    if os.path.exists(npz_path):
+        model = load_npz(npz_path)
+        if not os.path.exists(h5_path) or model.source_digest == file_digest(h5_path):
+            return model
+    from tensorflow.keras.models import load_model
+    return load_model(h5_path, compile=False)
+
+
+if __name__ == "__main__":
+    from tensorflow.keras.models import load_model
+
+    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Ekspor model embedding Keras ke .npz untuk inferensi NumPy")
+    parser.add_argument("--model", default=os.path.join(BASE_DIR, "../model/embedding_model.h5"))
+    parser.add_argument("--out", default=None)
+    parser.add_argument("--atol", type=float, default=PARITY_ATOL)
+    args = parser.parse_args()
+
+    out_path = args.out or default_npz_path(args.model)
+    keras_model = load_model(args.model, compile=False)
+    numpy_model = export_npz(keras_model, out_path, source_digest=file_digest(args.model))
+    max_diff = check_parity(keras_model, numpy_model)
+    print(f"Selisih maksimum Keras vs NumPy: {max_diff:.2e}")
+    if max_diff > args.atol:
+        os.unlink(out_path)
+        raise SystemExit(f"Paritas gagal (> {args.atol}), {out_path} dihapus")
+    print(f"Model NumPy disimpan ke {out_path}")
@@ -0,0 +1,117 @@
+import os
+import json
+import time
+import argparse
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from job_index import file_digest
+
+# Cache Parquet untuk dump O*NET mentah (raw_datasetfromonet/*.xlsx).
+# Tiap workbook dikonversi sekali (paralel di process pool) menjadi Parquet bertipe
+# dengan kolom teks berulang disimpan sebagai kategori. Build berikutnya hanya
+# mengonversi file yang berubah (dicek dari ukuran/mtime, lalu hash isi).
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RAW_DIR = os.path.join(BASE_DIR, "../raw_datasetfromonet")
+CACHE_DIR = os.path.join(BASE_DIR, "../Dataset/onet_parquet")
+MANIFEST_NAME = "manifest.json"
+CATEGORY_RATIO = 0.5
+
+
+def table_path(name, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"{name}.parquet")
+
+
+def _typed(df):
+    for col in df.columns:
+        if df[col].dtype == object or pd.api.types.is_string_dtype(df[col]):
+            values = df[col].astype('string')
+            if values.nunique(dropna=True) <= CATEGORY_RATIO * max(len(values), 1):
+                df[col] = values.astype('category')
+            else:
+                df[col] = values
+    return df
+
+
+def _convert(source, target):
+    start = time.perf_counter()
+    df = _typed(pd.read_excel(source, engine='openpyxl'))
+    tmp_path = f"{target}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, target)
+    return len(df), time.perf_counter() - start
+
+
+def _read_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(cache_dir, manifest):
+    path = os.path.join(cache_dir, MANIFEST_NAME)
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+def build_cache(raw_dir=RAW_DIR, cache_dir=CACHE_DIR, max_workers=None, force=False):
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = _read_manifest(cache_dir)
+    stale = {}
+    for filename in sorted(os.listdir(raw_dir)):
+        if not filename.endswith('.xlsx'):
+            continue
+        name = filename[:-len('.xlsx')]
+        source = os.path.join(raw_dir, filename)
+        stat = os.stat(source)
+        entry = manifest.get(name, {})
+        cached = os.path.exists(table_path(name, cache_dir)) and not force
+        if cached and entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns:
+            continue
+        digest = file_digest(source)
+        if cached and entry.get('sha256') == digest:
+            # Hanya mtime yang berubah (mis. hasil checkout ulang): tidak perlu konversi
+            entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            continue
+        stale[name] = (source, {'source': filename, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest})
+
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {name: pool.submit(_convert, source, table_path(name, cache_dir))
+                       for name, (source, _) in stale.items()}
+            for name, future in futures.items():
+                rows, seconds = future.result()
+                # Manifest hanya diperbarui untuk file yang berhasil dikonversi
+                manifest[name] = dict(stale[name][1], rows=rows, convert_seconds=round(seconds, 2))
+    finally:
+        _write_manifest(cache_dir, manifest)
+    return sorted(stale)
+
+
+def list_tables(cache_dir=CACHE_DIR):
+    return sorted(_read_manifest(cache_dir))
+
+
+def load_table(name, columns=None, cache_dir=CACHE_DIR, raw_dir=RAW_DIR):
+    # API loader bersama untuk training dan serving; fallback ke xlsx bila cache belum dibangun
+    path = table_path(name, cache_dir)
+    if os.path.exists(path):
+        return pd.read_parquet(path, columns=columns)
+    df = _typed(pd.read_excel(os.path.join(raw_dir, f"{name}.xlsx"), engine='openpyxl'))
+    return df[columns] if columns is not None else df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Konversi dump O*NET xlsx ke cache Parquet")
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true", help="Konversi ulang semua file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rebuilt = build_cache(args.raw_dir, args.cache_dir, args.workers, args.force)
+    print(f"{len(rebuilt)} tabel dikonversi dalam {time.perf_counter() - start:.1f} detik: {', '.join(rebuilt) or '-'}")
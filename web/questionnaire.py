@@ -0,0 +1,96 @@
+import numpy as np
+
+# Kuesioner RIASEC 42 butir dan matriks skoring bersama untuk web app, skrip CLI,
+# dan mode batch. Pemetaan butir -> dimensi dikompilasi sekali menjadi matriks
+# bobot 42x6 sehingga skoring satu responden maupun N responden cukup satu matmul.
+
+riasec_codes = ['R', 'I', 'A', 'S', 'E', 'C']
+riasec_types_list = ['Realistic', 'Investigative', 'Artistic', 'Social', 'Enterprising', 'Conventional']
+SCALE_MIN, SCALE_MAX = 1, 5
+
+# Data pertanyaan RIASEC yang diperbarui
+questions = [
+    {"question": "Saya suka bekerja dengan alat, mesin, atau tanaman.", "type": "R"},
+    {"question": "Saya senang menyelidiki masalah atau memecahkan teka-teki.", "type": "I"},
+    {"question": "Saya suka menggambar, melukis, atau menulis cerita.", "type": "A"},
+    {"question": "Saya menikmati membantu orang menyelesaikan masalah.", "type": "S"},
+    {"question": "Saya suka memimpin proyek atau orang.", "type": "E"},
+    {"question": "Saya menikmati bekerja dengan data atau angka.", "type": "C"},
+    {"question": "Saya menikmati aktivitas fisik atau pekerjaan lapangan.", "type": "R"},
+    {"question": "Saya suka menganalisis informasi dan melakukan eksperimen.", "type": "I"},
+    {"question": "Saya suka tampil di depan umum seperti berakting atau menyanyi.", "type": "A"},
+    {"question": "Saya senang mengajar atau melatih orang lain.", "type": "S"},
+    {"question": "Saya suka menjual atau mempromosikan ide atau produk.", "type": "E"},
+    {"question": "Saya suka pekerjaan yang melibatkan rutinitas dan struktur.", "type": "C"},
+    {"question": "Saya suka menggunakan alat atau kendaraan.", "type": "R"},
+    {"question": "Saya penasaran dengan bagaimana sesuatu bekerja.", "type": "I"},
+    {"question": "Saya suka mendesain atau membuat hal kreatif.", "type": "A"},
+    {"question": "Saya suka mendengarkan masalah orang dan membantu mereka.", "type": "S"},
+    {"question": "Saya suka mengambil keputusan dan mengambil risiko.", "type": "E"},
+    {"question": "Saya suka mengatur data atau menyusun informasi.", "type": "C"},
+    {"question": "Saya suka membangun atau memperbaiki sesuatu.", "type": "R"},
+    {"question": "Saya suka memecahkan masalah menggunakan logika.", "type": "I"},
+    {"question": "Saya suka menulis puisi, cerita, atau lagu.", "type": "A"},
+    {"question": "Saya suka menjadi sukarelawan dalam kegiatan sosial.", "type": "S"},
+    {"question": "Saya suka menjadi pemimpin dalam kelompok.", "type": "E"},
+    {"question": "Saya suka bekerja dengan komputer dan angka.", "type": "C"},
+    {"question": "Saya senang menggunakan kekuatan atau ketangkasan saya.", "type": "R"},
+    {"question": "Saya suka bertanya dan mengeksplorasi hal baru.", "type": "I"},
+    {"question": "Saya suka membuat karya seni atau musik.", "type": "A"},
+    {"question": "Saya suka mendengarkan dan memberi nasihat.", "type": "S"},
+    {"question": "Saya suka mengatur orang untuk mencapai tujuan.", "type": "E"},
+    {"question": "Saya suka bekerja dengan detail dan mengikuti instruksi.", "type": "C"},
+    {"question": "Saya suka bekerja di luar ruangan.", "type": "R"},
+    {"question": "Saya suka meneliti dan menganalisis masalah.", "type": "I"},
+    {"question": "Saya suka mengekspresikan diri melalui seni atau drama.", "type": "A"},
+    {"question": "Saya suka membimbing dan mengajar orang.", "type": "S"},
+    {"question": "Saya suka meyakinkan orang lain untuk membeli sesuatu.", "type": "E"},
+    {"question": "Saya suka menyusun laporan atau membuat tabel data.", "type": "C"},
+    {"question": "Saya suka menggunakan peralatan atau instrumen.", "type": "R"},
+    {"question": "Saya suka memecahkan teka-teki logika.", "type": "I"},
+    {"question": "Saya suka bermain musik atau menari.", "type": "A"},
+    {"question": "Saya suka membantu orang mengembangkan diri.", "type": "S"},
+    {"question": "Saya suka menjadi pemimpin proyek.", "type": "E"},
+    {"question": "Saya suka pekerjaan administratif atau perkantoran.", "type": "C"}
+]
+
+
+def compile_weights(item_types, dimensions=riasec_codes, reverse_keyed=(), scale_min=SCALE_MIN, scale_max=SCALE_MAX):
+    # Skor dimensi = rata-rata jawaban butirnya. Butir reverse-keyed dinilai (min + max - jawaban),
+    # yang linear sehingga cukup bobot negatif ditambah offset konstan.
+    item_types = list(item_types)
+    reverse_keyed = set(reverse_keyed)
+    weights = np.zeros((len(item_types), len(dimensions)), dtype=np.float64)
+    offset = np.zeros(len(dimensions), dtype=np.float64)
+    counts = {d: item_types.count(d) for d in dimensions}
+    for i, item_type in enumerate(item_types):
+        d = dimensions.index(item_type)
+        if i in reverse_keyed:
+            weights[i, d] = -1.0 / counts[item_type]
+            offset[d] += (scale_min + scale_max) / counts[item_type]
+        else:
+            weights[i, d] = 1.0 / counts[item_type]
+    return weights, offset
+
+
+WEIGHTS, OFFSET = compile_weights([q["type"] for q in questions])
+
+
+def answers_matrix(answers, n_items=len(questions)):
+    # Terima dict {indeks: jawaban}, list/array satu responden, atau array (N, n_items)
+    if isinstance(answers, dict):
+        row = np.zeros(n_items, dtype=np.float64)
+        for idx, value in answers.items():
+            row[idx] = value
+        return row[None, :]
+    return np.atleast_2d(np.asarray(answers, dtype=np.float64))
+
+
+def score_answers(answers, weights=WEIGHTS, offset=OFFSET, decimals=2):
+    single = isinstance(answers, dict) or np.ndim(answers) == 1
+    scores = np.round(answers_matrix(answers, len(weights)) @ weights + offset, decimals)
+    return scores[0] if single else scores
+
+
+def scores_dict(scores, dimensions=riasec_codes):
+    return {d: float(v) for d, v in zip(dimensions, scores)}
@@ -0,0 +1,252 @@
+import os
+import json
+import time
+import argparse
+import numpy as np
+from job_index import file_digest, l2_normalize
+
+# Graf "karier serupa" antar pekerjaan katalog dalam format CSR (indptr/indices).
+# Sisi berasal dari tabel Related Occupations O*NET (tier Primary-Short, Primary-Long,
+# Supplemental) ditambah k tetangga terdekat di ruang embedding. Tiap sisi menyimpan
+# tier dan cosine similarity embedding-nya, dan tetangga tiap baris sudah terurut
+# (tier, lalu similarity menurun), sehingga lookup cukup slicing array tanpa
+# menghitung ulang similarity. Node = baris index pekerjaan (urutan katalog).
+# Graf dibangun offline (CLI di bawah); aplikasi dan service hanya memuat file yang
+# kuncinya cocok (versi JobIndex, k, dan digest tabel Related Occupations).
+
+GRAPH_FORMAT = 2
+RELATED_TABLE = 'Related Occupations'
+TIERS = ('Primary-Short', 'Primary-Long', 'Supplemental', 'Embedding')
+EMBEDDING_TIER = TIERS.index('Embedding')
+DEFAULT_KNN = 10
+
+
+class RelatedGraph:
+    def __init__(self, indptr, indices, tiers, similarities, codes, titles, embeddings, build_key=''):
+        self.indptr = indptr
+        self.indices = indices
+        self.tiers = tiers
+        self.similarities = similarities
+        self.codes = codes
+        self.titles = titles
+        self.embeddings = embeddings  # embedding ternormalisasi per node, untuk skor 2-hop
+        self.build_key = build_key
+        self._nodes = {code: i for i, code in enumerate(codes)}
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def n_edges(self):
+        return len(self.indices)
+
+    def node(self, code):
+        return self._nodes.get(code)
+
+    def neighbor_idx(self, i):
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def _rows(self, idx, **extra):
+        return [
+            {'O*NET-SOC Code': str(self.codes[j]), 'Title': str(self.titles[j]), **{k: v[n] for k, v in extra.items()}}
+            for n, j in enumerate(idx)
+        ]
+
+    def neighbors(self, code, n=10):
+        i = self.node(code)
+        if i is None:
+            return []
+        start, end = self.indptr[i], min(self.indptr[i] + n, self.indptr[i + 1])
+        return self._rows(
+            self.indices[start:end],
+            Relatedness=[TIERS[t] for t in self.tiers[start:end]],
+            **{'Similarity Score': np.round(self.similarities[start:end].astype(float), 3).tolist()},
+        )
+
+    def two_hop(self, code, n=10):
+        # Tetangga dari tetangga yang belum terhubung langsung; diurutkan menurut jumlah
+        # jalur penghubung, lalu cosine similarity kandidat terhadap karier yang dipilih
+        i = self.node(code)
+        if i is None:
+            return []
+        direct = self.neighbor_idx(i)
+        if len(direct) == 0:
+            return []
+        edges = np.concatenate([np.arange(self.indptr[j], self.indptr[j + 1]) for j in direct])
+        candidates, paths = np.unique(self.indices[edges], return_counts=True)
+        keep = (candidates != i) & ~np.isin(candidates, direct)
+        candidates, paths = candidates[keep], paths[keep]
+        similarity = self.embeddings[candidates] @ self.embeddings[i]
+        order = np.lexsort((-similarity, -paths))[:n]
+        return self._rows(
+            candidates[order],
+            Paths=paths[order].tolist(),
+            **{'Similarity Score': np.round(similarity[order].astype(float), 3).tolist()},
+        )
+
+    def arrays(self):
+        return {
+            'indptr': self.indptr,
+            'indices': self.indices,
+            'tiers': self.tiers,
+            'similarities': self.similarities,
+            'codes': self.codes,
+            'titles': self.titles,
+            'embeddings': self.embeddings,
+        }
+
+
+def related_table_path():
+    # Cache Parquet bila ada, selain itu workbook mentah; None bila tabel tidak tersedia
+    from onet_cache import CACHE_DIR, RAW_DIR, table_path
+    for path in (table_path(RELATED_TABLE, CACHE_DIR), os.path.join(RAW_DIR, f"{RELATED_TABLE}.xlsx")):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def read_related_table(path):
+    import pandas as pd
+    columns = ['O*NET-SOC Code', 'Related O*NET-SOC Code', 'Relatedness Tier']
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_excel(path, engine='openpyxl', usecols=columns)
+
+
+def graph_sources(job_version, table_path=None):
+    # Sumber graf: graf basi bila model/katalog atau tabel Related Occupations berubah. Graf
+    # kNN saja (tabel belum ada) otomatis tidak cocok lagi begitu tabelnya tersedia
+    return {'job_version': job_version, 'related_table': file_digest(table_path) if table_path else None}
+
+
+def graph_key(job_version, k=DEFAULT_KNN, table_path=None):
+    return json.dumps({**graph_sources(job_version, table_path), 'k': k}, sort_keys=True)
+
+
+def related_edges(table, codes):
+    # Sisi O*NET antar pekerjaan yang ada di katalog: (src, dst, tier)
+    position = {code: i for i, code in enumerate(codes)}
+    src = table['O*NET-SOC Code'].astype(str).map(position)
+    dst = table['Related O*NET-SOC Code'].astype(str).map(position)
+    tier = table['Relatedness Tier'].astype(str).map({t: i for i, t in enumerate(TIERS)})
+    valid = (src.notna() & dst.notna() & tier.notna()).to_numpy()
+    return (src[valid].to_numpy(dtype=np.int64), dst[valid].to_numpy(dtype=np.int64),
+            tier[valid].to_numpy(dtype=np.int8))
+
+
+def knn_edges(embeddings, k, chunk_size=1024):
+    # k tetangga cosine terdekat per pekerjaan (tanpa dirinya sendiri), per blok baris
+    from topk import top_k_rows
+    unit = l2_normalize(embeddings)
+    src, dst = [], []
+    for start in range(0, len(unit), chunk_size):
+        sims = unit[start:start + chunk_size] @ unit.T
+        rows = np.arange(start, min(start + chunk_size, len(unit)))
+        sims[rows - start, rows] = -np.inf
+        idx, _ = top_k_rows(sims, k)
+        src.append(np.repeat(rows, idx.shape[1]))
+        dst.append(idx.ravel())
+    return np.concatenate(src), np.concatenate(dst)
+
+
+def build_related_graph(job_index, k=DEFAULT_KNN, table_path=None):
+    # table_path: tabel Related Occupations (lihat related_table_path); None = sisi kNN saja
+    embeddings = l2_normalize(job_index.dense_embeddings())
+    n = len(job_index)
+    if table_path is not None:
+        o_src, o_dst, o_tier = related_edges(read_related_table(table_path), job_index.codes)
+    else:
+        o_src = o_dst = np.empty(0, dtype=np.int64)
+        o_tier = np.empty(0, dtype=np.int8)
+    e_src, e_dst = knn_edges(embeddings, k) if k > 0 else (np.empty(0, np.int64), np.empty(0, np.int64))
+
+    src = np.concatenate([o_src, e_src])
+    dst = np.concatenate([o_dst, e_dst])
+    tiers = np.concatenate([o_tier, np.full(len(e_src), EMBEDDING_TIER, dtype=np.int8)])
+    similarities = np.einsum('ij,ij->i', embeddings[src], embeddings[dst]).astype(np.float32)
+
+    # Sisi ganda (O*NET dan kNN ke pekerjaan yang sama) cukup satu, dengan tier O*NET
+    order = np.lexsort((tiers, dst, src))
+    src, dst, tiers, similarities = src[order], dst[order], tiers[order], similarities[order]
+    first = np.ones(len(src), dtype=bool)
+    first[1:] = (src[1:] != src[:-1]) | (dst[1:] != dst[:-1])
+    src, dst, tiers, similarities = src[first], dst[first], tiers[first], similarities[first]
+
+    # Urutan tetangga per baris: tier, lalu similarity menurun
+    order = np.lexsort((-similarities, tiers, src))
+    indptr = np.zeros(n + 1, dtype=np.int32)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+    return RelatedGraph(
+        indptr=indptr,
+        indices=dst[order].astype(np.int32),
+        tiers=tiers[order],
+        similarities=similarities[order],
+        codes=np.asarray(job_index.codes, dtype=str),
+        titles=np.asarray(job_index.titles, dtype=str),
+        embeddings=embeddings.astype(np.float32),
+        build_key=graph_key(job_index.version, k, table_path),
+    )
+
+
+def save_related_graph(graph, path):
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(tmp_path, format=np.array(GRAPH_FORMAT), build_key=np.array(graph.build_key), **graph.arrays())
+    os.replace(tmp_path, path)
+
+
+def load_related_graph(path, sources=None):
+    # sources: hasil graph_sources untuk model/tabel saat ini; graf dari sumber lain dianggap
+    # basi (k mengikuti artefak yang dibangun CLI). Tidak pernah membangun graf: None bila
+    # file tidak ada, basi, atau gagal dibaca
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['format']) != GRAPH_FORMAT:
+                return None
+            built = json.loads(str(data['build_key']))
+            if sources is not None and any(built.get(name) != value for name, value in sources.items()):
+                return None
+            arrays = {name: data[name] for name in
+                      ('indptr', 'indices', 'tiers', 'similarities', 'codes', 'titles', 'embeddings')}
+            return RelatedGraph(build_key=str(data['build_key']), **arrays)
+    except (OSError, KeyError, ValueError, TypeError):
+        return None
+
+
+if __name__ == "__main__":
+    import warnings
+    import resources
+
+    parser = argparse.ArgumentParser(description="Bangun graf karier serupa (Related Occupations O*NET + kNN embedding)")
+    parser.add_argument("--out", default=resources.RELATED_GRAPH_PATH)
+    parser.add_argument("--k", type=int, default=DEFAULT_KNN, help="Tetangga embedding per pekerjaan")
+    parser.add_argument("--code", default=None, help="Tampilkan tetangga untuk satu kode O*NET-SOC")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    job_index = resources.get_job_index()
+    table_path = related_table_path()
+    if table_path is None:
+        print(f"Tabel {RELATED_TABLE} tidak ditemukan; graf hanya berisi sisi kNN")
+    start = time.perf_counter()
+    try:
+        graph = build_related_graph(job_index, args.k, table_path)
+    except (OSError, ImportError, ValueError) as exc:
+        print(f"Tabel {RELATED_TABLE} tidak bisa dibaca ({exc}); graf hanya berisi sisi kNN")
+        graph = build_related_graph(job_index, args.k)
+    build_seconds = time.perf_counter() - start
+    save_related_graph(graph, args.out)
+    print(f"{len(graph)} pekerjaan, {graph.n_edges} sisi, dibangun dalam {build_seconds:.2f} detik -> {args.out}")
+
+    code = args.code or str(graph.codes[0])
+    start = time.perf_counter()
+    for _ in range(1000):
+        graph.neighbors(code)
+        graph.two_hop(code)
+    # 1000 query: total detik = milidetik per query
+    print(f"Lookup tetangga + 2-hop: {time.perf_counter() - start:.3f} ms per query")
+    for row in graph.neighbors(code, 5):
+        print(f"  {row['Relatedness']:<14} {row['Similarity Score']:.3f}  {row['Title']}")
+    for row in graph.two_hop(code, 5):
+        print(f"  2-hop ({row['Paths']} jalur)  {row['Similarity Score']:.3f}  {row['Title']}")
@@ -0,0 +1,211 @@
+import os
+import sys
+import json
+import time
+import threading
+import joblib
+import numpy as np
+import pandas as pd
+import metrics
+from job_index import load_or_build_mmap_index, model_version
+from numpy_model import load_embedding_model
+
+# Cache resource tingkat proses: model, scaler, katalog, dan index pekerjaan
+# dimuat sekali per proses server lalu dibagikan (read-only) ke semua sesi.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(BASE_DIR, "../model/embedding_model.h5")
+SCALER_PATH = os.path.join(BASE_DIR, "../model/scaler.pkl")
+CATALOG_PATH = os.path.join(BASE_DIR, "../dataset/job_with_family.csv")
+# Direktori artefak train/pipeline.py (Model/ di root repo); pipeline mengimport konstanta ini
+MODEL_DIR = os.path.join(BASE_DIR, "../Model")
+RELEASE_POINTER_NAME = "current.json"
+# Pointer release dari train/pipeline.py; bila ada, model/scaler/katalog diambil dari release yang sama
+RELEASE_POINTER_PATH = os.path.join(MODEL_DIR, RELEASE_POINTER_NAME)
+# FM_SHARED_CATALOG=1: katalog dibagikan antar proses lewat shared memory (lihat shared_catalog.py)
+SHARED_CATALOG = os.environ.get("FM_SHARED_CATALOG", "").lower() in ("1", "true", "yes")
+JOB_INDEX_DIR = os.path.join(BASE_DIR, "../model/job_index_mmap")
+# float32 (default), float16, atau int8 dengan skala per baris
+JOB_INDEX_DTYPE = os.environ.get("FM_INDEX_DTYPE", "float32")
+TITLE_INDEX_PATH = os.path.join(BASE_DIR, "../model/title_index.npz")
+# Parameter build index jabatan mengikuti artefak (python web/ann_index.py); FM_TITLE_NPROBE
+# hanya mengganti jumlah sel IVF yang diperiksa per query saat serving
+TITLE_INDEX_NPROBE = int(os.environ["FM_TITLE_NPROBE"]) if os.environ.get("FM_TITLE_NPROBE") else None
+RELATED_GRAPH_PATH = os.path.join(BASE_DIR, "../model/related_graph.npz")
+FEATURE_STORE_DIR = os.path.join(BASE_DIR, "../Dataset/feature_store")
+
+_lock = threading.RLock()
+_cache = {}
+
+
+def resolve_release(pointer_path=None):
+    # Set MODEL_PATH/SCALER_PATH/CATALOG_PATH ke release aktif; tanpa pointer path default dipakai
+    global MODEL_PATH, SCALER_PATH, CATALOG_PATH
+    pointer_path = pointer_path or RELEASE_POINTER_PATH
+    try:
+        with open(pointer_path) as f:
+            files = json.load(f)['files']
+    except (OSError, ValueError, KeyError):
+        return None
+    base = os.path.dirname(pointer_path)
+    MODEL_PATH = os.path.join(base, files['model'])
+    SCALER_PATH = os.path.join(base, files['scaler'])
+    CATALOG_PATH = os.path.join(base, files['catalog'])
+    return os.path.dirname(MODEL_PATH)
+
+
+resolve_release()
+
+
+def _approx_bytes(value):
+    if isinstance(value, np.memmap):
+        # Array memory-mapped dibagi antar proses lewat page cache, bukan memori privat
+        return 0
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, dict):
+        return sum(_approx_bytes(v) for v in value.values())
+    if hasattr(value, 'get_weights'):
+        return sum(w.nbytes for w in value.get_weights())
+    if hasattr(value, '__dict__'):
+        return sum(_approx_bytes(v) for v in vars(value).values() if isinstance(v, (np.ndarray, pd.DataFrame, dict)))
+    return sys.getsizeof(value)
+
+
+def get_resource(name, loader):
+    with _lock:
+        entry = _cache.get(name)
+        if entry is None:
+            start = time.perf_counter()
+            value = loader()
+            entry = {
+                'value': value,
+                'loaded_at': time.time(),
+                'load_seconds': time.perf_counter() - start,
+                'hits': 0,
+                'bytes': _approx_bytes(value),
+            }
+            _cache[name] = entry
+            metrics.observe('fm_resource_load_seconds', entry['load_seconds'], resource=name)
+        else:
+            entry['hits'] += 1
+            metrics.inc('fm_resource_cache_hits_total', resource=name)
+        return entry['value']
+
+
+def _load_job_index():
+    # Index di-map read-only dari disk sehingga semua proses worker berbagi satu salinan
+    index = load_or_build_mmap_index(
+        get_model(),
+        get_scaler(),
+        get_catalog(),
+        JOB_INDEX_DIR,
+        model_version(MODEL_PATH, SCALER_PATH, CATALOG_PATH),
+        JOB_INDEX_DTYPE
+    )
+    index.embeddings.flags.writeable = False
+    return index
+
+
+def _load_title_index():
+    from ann_index import load_or_build_title_index
+    params = {'nprobe': TITLE_INDEX_NPROBE} if TITLE_INDEX_NPROBE else {}
+    return load_or_build_title_index(get_job_index(), TITLE_INDEX_PATH, **params)
+
+
+def _load_related_graph():
+    # Graf dibangun offline (python web/related_graph.py); None bila belum ada atau basi
+    from related_graph import load_related_graph, graph_sources, related_table_path
+    return load_related_graph(RELATED_GRAPH_PATH, graph_sources(get_job_index().version, related_table_path()))
+
+
+def _load_feature_store():
+    # Hanya memuat store yang dibangun offline (python web/feature_store.py); tidak pernah
+    # membangun di dalam request. Store tidak ada/rusak = {} dan panel skill disembunyikan
+    try:
+        from feature_store import load_feature_store
+    except ImportError:
+        return {}
+    return load_feature_store(FEATURE_STORE_DIR)
+
+
+def get_model():
+    # Memakai model NumPy (.npz) bila tersedia sehingga TensorFlow tidak perlu diimport
+    return get_resource('model', lambda: load_embedding_model(MODEL_PATH))
+
+
+def get_scaler():
+    return get_resource('scaler', lambda: joblib.load(SCALER_PATH))
+
+
+def _load_catalog():
+    if SHARED_CATALOG:
+        from shared_catalog import load_shared_catalog
+        # Objek segmen disimpan di cache agar mapping hidup selama DataFrame dipakai
+        return get_resource('shared_catalog', lambda: load_shared_catalog(CATALOG_PATH)).to_frame()
+    return pd.read_csv(CATALOG_PATH)
+
+
+def get_catalog():
+    # Katalog dibagikan antar sesi: pemanggil tidak boleh memodifikasi in-place
+    return get_resource('catalog', _load_catalog)
+
+
+def get_job_index():
+    return get_resource('job_index', _load_job_index)
+
+
+def get_title_index():
+    # Index jabatan alternatif/dilaporkan (IVF atas vektor okupasi) untuk /titles/* di service;
+    # dibangun dari cache O*NET bila belum ada
+    return get_resource('title_index', _load_title_index)
+
+
+def get_related_graph():
+    # Graf karier serupa (CSR) untuk lookup tetangga & 2-hop; None bila graf belum dibangun
+    return get_resource('related_graph', _load_related_graph)
+
+
+def get_feature_store():
+    # {'skills': FeatureMatrix, 'knowledge': ...}; kosong bila store belum dibangun
+    return get_resource('feature_store', _load_feature_store)
+
+
+def invalidate(name=None):
+    # Hapus satu resource (atau semuanya) agar dimuat ulang pada akses berikutnya
+    with _lock:
+        if name is None:
+            # Reload penuh juga membaca ulang pointer release (mis. setelah pipeline selesai)
+            resolve_release()
+            _cache.clear()
+        else:
+            _cache.pop(name, None)
+            if name in ('model', 'scaler', 'catalog'):
+                _cache.pop('job_index', None)
+            if name in ('model', 'scaler', 'catalog', 'job_index'):
+                _cache.pop('title_index', None)
+                _cache.pop('related_graph', None)
+
+
+def resource_report():
+    with _lock:
+        rows = [
+            {
+                'resource': name,
+                'loaded_at': entry['loaded_at'],
+                'load_seconds': round(entry['load_seconds'], 4),
+                'hits': entry['hits'],
+                'approx_mb': round(entry['bytes'] / 1e6, 3),
+            }
+            for name, entry in _cache.items()
+        ]
+    report = {'resources': rows, 'total_mb': round(sum(r['approx_mb'] for r in rows), 3)}
+    try:
+        import resource
+        # ru_maxrss dalam KB di Linux
+        report['peak_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3, 1)
+    except ImportError:
+        pass
+    return report
@@ -0,0 +1,383 @@
+import json
+import time
+import asyncio
+import argparse
+from urllib.parse import parse_qs, unquote
+import numpy as np
+import resources
+import metrics
+from job_index import l2_normalize
+from topk import top_k_rows
+from questionnaire import questions, riasec_types_list, score_answers, answers_matrix, SCALE_MIN, SCALE_MAX
+
+# Layanan rekomendasi tanpa UI (untuk integrasi LMS) berbasis asyncio + HTTP sederhana.
+# Request yang datang berdekatan digabung (micro-batching) menjadi satu forward pass
+# embedding dan satu perkalian matriks terhadap index pekerjaan.
+
+N_ITEMS = len(questions)
+MAX_TOP_N = 50
+MAX_BODY_BYTES = 64 * 1024
+REASON_HEADER = "Skor tertinggi Anda pada dimensi"
+
+
+class Overloaded(Exception):
+    pass
+
+
+class BadRequest(Exception):
+    pass
+
+
+class Unavailable(Exception):
+    # Artefak opsional (graf karier serupa, index jabatan) belum dibangun
+    pass
+
+
+def embed_scores(scores):
+    # scores: (n, 6) skor RIASEC -> embedding pengguna ternormalisasi
+    model = resources.get_model()
+    scaler = resources.get_scaler()
+    scores = np.asarray(scores, dtype=np.float32)
+    scaled = (scores - scaler.mean_) / scaler.scale_
+    return l2_normalize(model.predict(scaled.astype(np.float32), verbose=0))
+
+
+def recommend_scores_batch(scores, top_n):
+    # scores: (n, 6) skor RIASEC; mengembalikan indeks dan similarity top-n per baris
+    index = resources.get_job_index()
+    top_idx, top_sim = top_k_rows(index.score_matrix(embed_scores(scores)), top_n)
+    return top_idx, top_sim
+
+
+def match_titles(scores, top_n, per_occupation):
+    # Jabatan alternatif/dilaporkan terdekat untuk satu profil lewat index jabatan (IVF)
+    title_index = resources.get_title_index()
+    idx, sims = title_index.search(embed_scores(scores[None, :]), top_n, per_occupation)
+    return title_index.lookup(idx[0], sims[0])
+
+
+def format_recommendations(user_scores, top_idx, top_sim):
+    index = resources.get_job_index()
+    top_dim = [riasec_types_list[j] for j in np.argsort(-np.asarray(user_scores), kind='stable')[:2]]
+    reason = f"{REASON_HEADER} {top_dim[0]} dan {top_dim[1]}"
+    return [
+        {
+            'O*NET-SOC Code': str(index.codes[i]),
+            'Title': str(index.titles[i]),
+            'Job Family': str(index.job_families[i]),
+            'Similarity Score': round(float(s), 3),
+            'Alasan': reason,
+        }
+        for i, s in zip(top_idx, top_sim)
+    ]
+
+
+class MicroBatcher:
+    # Antrian request -> batch berisi maksimal max_batch item atau menunggu max_wait_ms
+    # sejak item pertama, mana yang lebih dulu. Antrian penuh = backpressure (503).
+
+    def __init__(self, max_batch=64, max_wait_ms=5.0, max_queue=1024):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue = max_queue
+        self.queue = None
+        self._worker = None
+        self.stats = {
+            'requests': 0,
+            'rejected': 0,
+            'batches': 0,
+            'batched_items': 0,
+            'max_batch_seen': 0,
+            'compute_seconds': 0.0,
+        }
+
+    def start(self):
+        self.queue = asyncio.Queue(maxsize=self.max_queue)
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+
+    @property
+    def depth(self):
+        return self.queue.qsize() if self.queue is not None else 0
+
+    def submit(self, scores, top_n):
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((scores, top_n, future))
+        except asyncio.QueueFull:
+            self.stats['rejected'] += 1
+            raise Overloaded(f"Antrian penuh ({self.max_queue} request)")
+        self.stats['requests'] += 1
+        return future
+
+    async def _collect(self):
+        batch = [await self.queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        # Ambil juga item yang sudah menunggu tanpa perlu menunggu lagi
+        while len(batch) < self.max_batch and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            batch = [item for item in batch if not item[2].cancelled()]
+            if not batch:
+                continue
+            scores = np.stack([item[0] for item in batch])
+            top_n = max(item[1] for item in batch)
+            start = time.perf_counter()
+            try:
+                # Komputasi NumPy dijalankan di thread agar event loop tetap menerima koneksi
+                top_idx, top_sim = await loop.run_in_executor(None, recommend_scores_batch, scores, top_n)
+            except Exception as exc:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            elapsed = time.perf_counter() - start
+            self.stats['compute_seconds'] += elapsed
+            metrics.observe('fm_stage_seconds', elapsed, stage='service_batch')
+            metrics.inc('fm_recommendations_served_total', sum(item[1] for item in batch))
+            self.stats['batches'] += 1
+            self.stats['batched_items'] += len(batch)
+            self.stats['max_batch_seen'] = max(self.stats['max_batch_seen'], len(batch))
+            for row, (user_scores, n, future) in enumerate(batch):
+                if not future.done():
+                    future.set_result(format_recommendations(user_scores, top_idx[row, :n], top_sim[row, :n]))
+
+
+def _parse_top_n(payload):
+    top_n = payload.get('top_n', 5)
+    if not isinstance(top_n, int) or not 1 <= top_n <= MAX_TOP_N:
+        raise BadRequest(f"top_n harus bilangan bulat 1-{MAX_TOP_N}")
+    return top_n
+
+
+def _parse_per_occupation(payload):
+    per_occupation = payload.get('per_occupation', 3)
+    if not isinstance(per_occupation, int) or not 1 <= per_occupation <= MAX_TOP_N:
+        raise BadRequest(f"per_occupation harus bilangan bulat 1-{MAX_TOP_N}")
+    return per_occupation
+
+
+def parse_scores(payload):
+    scores = payload.get('scores')
+    if isinstance(scores, dict):
+        missing = [k for k in riasec_types_list if k not in scores]
+        if missing:
+            raise BadRequest(f"Skor untuk {', '.join(missing)} tidak ada")
+        scores = [scores[k] for k in riasec_types_list]
+    try:
+        scores = np.asarray(scores, dtype=np.float32)
+    except (TypeError, ValueError):
+        raise BadRequest("scores harus berupa list 6 angka atau objek per dimensi RIASEC")
+    if scores.shape != (len(riasec_types_list),) or not np.all(np.isfinite(scores)):
+        raise BadRequest("scores harus berupa list 6 angka atau objek per dimensi RIASEC")
+    return scores
+
+
+def parse_answers(payload):
+    answers = payload.get('answers')
+    if not isinstance(answers, list) or len(answers) != N_ITEMS:
+        raise BadRequest(f"answers harus berupa list {N_ITEMS} jawaban")
+    try:
+        answers = answers_matrix(answers)
+    except (TypeError, ValueError):
+        raise BadRequest(f"answers harus berupa list {N_ITEMS} angka")
+    if not np.all((answers >= SCALE_MIN) & (answers <= SCALE_MAX)):
+        raise BadRequest(f"answers harus berupa list {N_ITEMS} jawaban bernilai {SCALE_MIN}-{SCALE_MAX}")
+    return score_answers(answers)[0].astype(np.float32)
+
+
+def related_careers(code, params):
+    # GET /related/<kode O*NET-SOC>?n=10: tetangga langsung dan 2-hop dari graf CSR
+    graph = resources.get_related_graph()
+    if graph is None:
+        raise Unavailable("Graf karier serupa belum dibangun (python web/related_graph.py)")
+    if graph.node(code) is None:
+        raise BadRequest(f"Kode O*NET-SOC '{code}' tidak ada di katalog")
+    try:
+        n = int(params.get('n', ['10'])[0])
+    except ValueError:
+        raise BadRequest("n harus berupa bilangan bulat")
+    if not 1 <= n <= MAX_TOP_N:
+        raise BadRequest(f"n harus antara 1 dan {MAX_TOP_N}")
+    return {
+        'code': code,
+        'title': str(graph.titles[graph.node(code)]),
+        'related': graph.neighbors(code, n),
+        'two_hop': graph.two_hop(code, n),
+    }
+
+
+class RecommendationService:
+    def __init__(self, batcher):
+        self.batcher = batcher
+        self.started_at = time.time()
+        self.status_counts = {}
+
+    async def _recommend(self, scores, payload):
+        future = self.batcher.submit(scores, _parse_top_n(payload))
+        recommendations = await future
+        return {
+            'scores': dict(zip(riasec_types_list, np.round(scores.astype(float), 2).tolist())),
+            'recommendations': recommendations,
+        }
+
+    async def _titles(self, scores, payload):
+        top_n, per_occupation = _parse_top_n(payload), _parse_per_occupation(payload)
+        titles = await asyncio.get_running_loop().run_in_executor(None, match_titles, scores, top_n, per_occupation)
+        return {
+            'scores': dict(zip(riasec_types_list, np.round(scores.astype(float), 2).tolist())),
+            'titles': titles,
+        }
+
+    async def route(self, method, path, body, query=''):
+        if method == 'GET' and path == '/healthz':
+            return 200, {'status': 'ok', 'queue_depth': self.batcher.depth, 'uptime_seconds': round(time.time() - self.started_at, 1)}
+        if method == 'GET' and path == '/metrics':
+            return 200, self.metrics()
+        if method == 'GET' and path == '/metrics/prometheus':
+            # Teks Prometheus; kosong bila instrumentasi tidak diaktifkan (FM_METRICS)
+            return 200, metrics.export_text()
+        if method == 'GET' and path.startswith('/related/'):
+            return 200, related_careers(unquote(path[len('/related/'):]), parse_qs(query))
+        if method == 'POST' and path in ('/recommend/scores', '/recommend/answers', '/titles/scores', '/titles/answers'):
+            try:
+                payload = json.loads(body or b'{}')
+            except ValueError:
+                raise BadRequest("Body harus berupa JSON")
+            if not isinstance(payload, dict):
+                raise BadRequest("Body harus berupa objek JSON")
+            scores = parse_scores(payload) if path.endswith('/scores') else parse_answers(payload)
+            if path.startswith('/titles/'):
+                return 200, await self._titles(scores, payload)
+            return 200, await self._recommend(scores, payload)
+        return 404, {'error': f"{method} {path} tidak ditemukan"}
+
+    def metrics(self):
+        stats = dict(self.batcher.stats)
+        stats['compute_seconds'] = round(stats['compute_seconds'], 4)
+        stats['mean_batch_size'] = round(stats['batched_items'] / stats['batches'], 2) if stats['batches'] else 0.0
+        stats['queue_depth'] = self.batcher.depth
+        stats['max_batch'] = self.batcher.max_batch
+        stats['max_wait_ms'] = self.batcher.max_wait * 1000.0
+        stats['responses'] = dict(self.status_counts)
+        stats['resources'] = resources.resource_report()
+        return stats
+
+    async def handle(self, reader, writer):
+        # HTTP/1.1 minimal dengan keep-alive; cukup untuk klien JSON internal
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, _ = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, 400, {'error': "Request line tidak valid"}, False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                length = int(headers.get('content-length') or 0)
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {'error': "Body terlalu besar"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                try:
+                    path, _, query = target.partition('?')
+                    status, payload = await self.route(method, path, body, query)
+                except BadRequest as exc:
+                    status, payload = 400, {'error': str(exc)}
+                except (Overloaded, Unavailable) as exc:
+                    status, payload = 503, {'error': str(exc)}
+                except Exception as exc:
+                    status, payload = 500, {'error': f"{type(exc).__name__}: {exc}"}
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large',
+                   500: 'Internal Server Error', 503: 'Service Unavailable'}
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), "text/plain; version=0.0.4"
+        else:
+            body, content_type = json.dumps(payload).encode(), "application/json"
+        headers = [
+            f"HTTP/1.1 {status} {reasons.get(status, '')}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == 503:
+            headers.append("Retry-After: 1")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + body)
+        await writer.drain()
+
+
+async def serve(host='127.0.0.1', port=8600, max_batch=64, max_wait_ms=5.0, max_queue=1024):
+    # Muat model/index di awal agar request pertama tidak menanggung waktu loading
+    resources.get_job_index()
+    # Artefak opsional: bila belum dibangun atau gagal dimuat, endpointnya menjawab 503/500
+    # tetapi layanan rekomendasi tetap berjalan
+    for name, loader in (('graf karier serupa', resources.get_related_graph), ('index jabatan', resources.get_title_index)):
+        try:
+            if loader() is None:
+                print(f"{name} belum dibangun; endpoint terkait belum bisa dipakai")
+        except (OSError, ImportError, ValueError) as exc:
+            print(f"{name} tidak bisa dimuat ({exc}); endpoint terkait belum bisa dipakai")
+    batcher = MicroBatcher(max_batch, max_wait_ms, max_queue)
+    batcher.start()
+    service = RecommendationService(batcher)
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"Layanan rekomendasi berjalan di http://{host}:{port} (max_batch={max_batch}, max_wait_ms={max_wait_ms})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await batcher.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Layanan HTTP rekomendasi karier dengan micro-batching")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--max-batch", type=int, default=64, help="Jumlah request maksimum per batch")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0, help="Waktu tunggu maksimum untuk mengisi batch")
+    parser.add_argument("--max-queue", type=int, default=1024, help="Request tertunda maksimum sebelum dijawab 503")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.max_batch, args.max_wait_ms, args.max_queue))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,245 @@
+import os
+import json
+import time
+import atexit
+import argparse
+import numpy as np
+import pandas as pd
+from multiprocessing import shared_memory, resource_tracker
+from job_index import file_digest
+
+# Katalog pekerjaan di shared memory untuk deployment multi-proses di satu mesin.
+# Proses pertama mem-parse CSV lalu mempublikasikannya sebagai kolom NumPy dalam satu
+# segmen; proses lain cukup attach tanpa menyalin. Kolom teks disimpan sebagai tabel
+# string ber-offset (int32 offsets + byte UTF-8 + bitmap validitas, layout yang sama
+# dengan Arrow) sehingga nilai kosong (NaN) tetap kosong seperti pada pd.read_csv.
+# Nama segmen diturunkan dari hash isi CSV, jadi isi segmen tidak pernah berubah
+# setelah dipublikasikan dan setiap pembaca melihat snapshot yang konsisten.
+
+MAGIC = b"FMCAT002"
+HEADER_SIZE = 16  # magic (8 byte) + panjang manifest JSON (8 byte)
+ALIGN = 64
+ATTACH_TIMEOUT = 5.0
+
+
+class _Segment(shared_memory.SharedMemory):
+    # View NumPy/Arrow menunjuk langsung ke buffer segmen, jadi mapping dibiarkan hidup
+    # sampai proses keluar alih-alih ditutup oleh garbage collector
+    def __del__(self):
+        pass
+
+
+def segment_name(digest):
+    # Versi format ikut di nama agar segmen format lama tidak di-attach
+    return f"fm_catalog2_{digest[:16]}"
+
+
+def _aligned(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _encode_strings(values):
+    # (offsets, data, validity): baris kosong = string panjang 0 dengan bit validitas 0
+    valid = ~pd.isna(values)
+    encoded = [str(v).encode('utf-8') if ok else b'' for v, ok in zip(values, valid)]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int32)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    bitmap = np.packbits(valid, bitorder='little')
+    return offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8), bitmap
+
+
+def _columns(df):
+    # Kolom numerik -> satu buffer; kolom teks -> (offsets, data)
+    for name in df.columns:
+        series = df[name]
+        if pd.api.types.is_numeric_dtype(series):
+            yield name, 'numeric', [np.ascontiguousarray(series.to_numpy())]
+        else:
+            yield name, 'string', list(_encode_strings(series.to_numpy()))
+
+
+def _layout(df):
+    columns = list(_columns(df))
+    manifest = {'rows': len(df), 'columns': []}
+    offset = 0
+    buffers = []
+    for name, kind, arrays in columns:
+        entry = {'name': name, 'kind': kind, 'buffers': []}
+        for array in arrays:
+            entry['buffers'].append({'offset': offset, 'dtype': array.dtype.str, 'length': len(array)})
+            buffers.append((offset, array))
+            offset = _aligned(offset + array.nbytes)
+        manifest['columns'].append(entry)
+    return manifest, buffers, offset
+
+
+def publish(df, name):
+    # Tulis seluruh isi dulu, magic terakhir: pembaca tidak pernah melihat segmen setengah jadi
+    manifest, buffers, data_size = _layout(df)
+    header = json.dumps(manifest).encode()
+    data_start = _aligned(HEADER_SIZE + len(header))
+    shm = _Segment(name=name, create=True, size=max(data_start + data_size, 1))
+    shm.buf[8:16] = len(header).to_bytes(8, 'little')
+    shm.buf[HEADER_SIZE:HEADER_SIZE + len(header)] = header
+    for offset, array in buffers:
+        start = data_start + offset
+        shm.buf[start:start + array.nbytes] = array.tobytes()
+    shm.buf[0:8] = MAGIC
+    return shm
+
+
+class SharedCatalog:
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        header_len = int.from_bytes(bytes(shm.buf[8:16]), 'little')
+        self.manifest = json.loads(bytes(shm.buf[HEADER_SIZE:HEADER_SIZE + header_len]))
+        self._data_start = _aligned(HEADER_SIZE + header_len)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def __len__(self):
+        return self.manifest['rows']
+
+    def _buffer(self, spec):
+        dtype = np.dtype(spec['dtype'])
+        array = np.frombuffer(self.shm.buf, dtype=dtype, count=spec['length'],
+                              offset=self._data_start + spec['offset'])
+        array.flags.writeable = False
+        return array
+
+    def column(self, name):
+        # Numerik: view NumPy langsung ke shared memory; teks: (offsets, data, validity) tanpa decode
+        entry = next(c for c in self.manifest['columns'] if c['name'] == name)
+        arrays = [self._buffer(spec) for spec in entry['buffers']]
+        return arrays[0] if entry['kind'] == 'numeric' else tuple(arrays)
+
+    def _valid(self, name):
+        bitmap = self.column(name)[2]
+        return np.unpackbits(bitmap, count=len(self), bitorder='little').astype(bool)
+
+    def strings(self, name, idx=None):
+        # Decode hanya baris yang diminta (mis. top-k rekomendasi); baris kosong = NaN
+        offsets, data, _ = self.column(name)
+        valid = self._valid(name)
+        rows = range(len(self)) if idx is None else idx
+        return np.array([bytes(data[offsets[i]:offsets[i + 1]]).decode('utf-8') if valid[i] else np.nan
+                         for i in rows], dtype=object)
+
+    def _string_array(self, name):
+        offsets, data, bitmap = self.column(name)
+        try:
+            import pyarrow as pa
+        except ImportError:
+            # Tanpa pyarrow kolom teks di-decode sekali per proses
+            return self.strings(name)
+        null_count = len(self) - int(self._valid(name).sum())
+        arrow = pa.StringArray.from_buffers(len(self), pa.py_buffer(offsets), pa.py_buffer(data),
+                                            pa.py_buffer(bitmap) if null_count else None, null_count)
+        return pd.arrays.ArrowStringArray(arrow)
+
+    def to_frame(self, columns=None):
+        # DataFrame yang kolomnya menunjuk langsung ke segmen (kolom teks via Arrow bila tersedia)
+        wanted = columns or [c['name'] for c in self.manifest['columns']]
+        kinds = {c['name']: c['kind'] for c in self.manifest['columns']}
+        data = {
+            name: self.column(name) if kinds[name] == 'numeric' else self._string_array(name)
+            for name in wanted
+        }
+        return pd.DataFrame(data, copy=False)
+
+    def close(self):
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+def _untrack(shm):
+    # Python < 3.13 mendaftarkan segmen yang di-attach ke resource_tracker, yang akan
+    # meng-unlink segmen milik proses lain saat proses ini keluar
+    try:
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:
+        pass
+
+
+def attach(name, timeout=ATTACH_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    shm = _Segment(name=name)
+    _untrack(shm)
+    # Penerbit mungkin masih menulis; tunggu sampai magic terpasang
+    while bytes(shm.buf[0:8]) != MAGIC:
+        if time.monotonic() > deadline:
+            shm.close()
+            raise TimeoutError(f"Segmen {name} belum selesai dipublikasikan")
+        time.sleep(0.01)
+    return SharedCatalog(shm, owner=False)
+
+
+def load_shared_catalog(csv_path, persist=False, attempts=3):
+    # Attach ke snapshot yang sudah ada, atau parse CSV dan publikasikan bila belum ada
+    name = segment_name(file_digest(csv_path))
+    df = None
+    for _ in range(attempts):
+        try:
+            return attach(name)
+        except FileNotFoundError:
+            pass
+        except TimeoutError:
+            # Penerbit mati sebelum magic ditulis: segmen ini tidak akan pernah lengkap,
+            # lepas namanya lalu publikasikan ulang
+            _unlink_stale(name)
+        if df is None:
+            df = pd.read_csv(csv_path)
+        try:
+            shm = publish(df, name)
+        except FileExistsError:
+            # Proses lain mempublikasikan lebih dulu
+            continue
+        if persist:
+            # Segmen tetap ada setelah proses ini keluar (hapus manual dengan --unlink)
+            _untrack(shm)
+        else:
+            # Nama segmen dilepas saat penerbit keluar; proses yang sudah attach tetap memegang
+            # mapping-nya, dan worker baru akan mempublikasikan ulang snapshot yang sama
+            atexit.register(_unlink_quietly, shm)
+        return SharedCatalog(shm, owner=True)
+    raise TimeoutError(f"Segmen {name} tidak bisa di-attach maupun dipublikasikan")
+
+
+def _unlink_stale(name):
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    shm.close()
+    _unlink_quietly(shm)
+
+
+def _unlink_quietly(shm):
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+
+if __name__ == "__main__":
+    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Publikasikan katalog pekerjaan ke shared memory")
+    parser.add_argument("--catalog", default=os.path.join(BASE_DIR, "../dataset/job_with_family.csv"))
+    parser.add_argument("--unlink", action="store_true", help="Hapus segmen untuk versi katalog ini")
+    args = parser.parse_args()
+
+    if args.unlink:
+        catalog = attach(segment_name(file_digest(args.catalog)))
+        catalog.unlink()
+        print(f"Segmen {catalog.name} dihapus")
+    else:
+        start = time.perf_counter()
+        catalog = load_shared_catalog(args.catalog, persist=True)
+        role = "dipublikasikan" if catalog.owner else "sudah ada"
+        print(f"Katalog {len(catalog)} baris {role} di /dev/shm/{catalog.name} "
+              f"({catalog.shm.size / 1e3:.0f} KB, {time.perf_counter() - start:.3f} detik)")
@@ -0,0 +1,65 @@
+import numpy as np
+
+# Seleksi top-k dengan argpartition (O(n)) dan hanya mengurutkan k elemen teratas.
+# Urutan total: skor menurun, lalu indeks menaik untuk skor yang sama, sehingga
+# prefix hasil selalu konsisten antar pemanggilan dengan k berbeda.
+
+
+def top_k(scores, k):
+    scores = np.asarray(scores)
+    k = min(int(k), len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        part = np.argpartition(-scores, k - 1)[:k]
+        kth = scores[part].min()
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[:k - len(above)]
+        idx = np.concatenate([above, ties])
+    else:
+        idx = np.arange(len(scores))
+    return idx[np.lexsort((idx, -scores[idx]))]
+
+
+def top_k_rows(scores, k):
+    # Versi batch: top-k per baris dari matriks skor (n_query, n_item)
+    scores = np.asarray(scores)
+    k = min(int(k), scores.shape[1])
+    if k < scores.shape[1]:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        part = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind='stable')
+    idx = np.take_along_axis(part, order, axis=1)
+    return idx, np.take_along_axis(part_scores, order, axis=1)
+
+
+class RecommendationCursor:
+    # Menyimpan vektor similarity sekali, lalu menyajikan halaman berikutnya ("load more")
+    # tanpa menghitung ulang similarity.
+
+    def __init__(self, scores, page_size=5):
+        self.scores = np.asarray(scores)
+        self.page_size = page_size
+        self.offset = 0
+        self._ranked = np.empty(0, dtype=np.int64)
+
+    def _ranked_prefix(self, n):
+        n = min(n, len(self.scores))
+        if n > len(self._ranked):
+            # Perbesar prefix secara geometris agar halaman berikutnya tidak perlu seleksi ulang
+            self._ranked = top_k(self.scores, max(n, 2 * len(self._ranked)))
+        return self._ranked[:n]
+
+    @property
+    def has_more(self):
+        return self.offset < len(self.scores)
+
+    def next_page(self):
+        idx = self._ranked_prefix(self.offset + self.page_size)[self.offset:]
+        self.offset += len(idx)
+        return idx
+
+    def shown(self):
+        return self._ranked_prefix(self.offset)